@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Collection, Optional
+
+from starlette.responses import JSONResponse
+
+# Relative budget in milliseconds, so client and server clocks need not agree
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before its work started."""
+
+
+class _Overloaded(Exception):
+    pass
+
+
+def expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and perf_counter() >= deadline
+
+
+def check_deadline(deadline: Optional[float]) -> None:
+    if expired(deadline):
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+class AdmissionControl:
+    """
+    ASGI middleware bounding how much prediction work is accepted.
+
+    At most ``max_concurrency`` requests to ``paths`` run at once; up to
+    ``max_queue`` more wait in arrival order and the rest are rejected at
+    once with 503 and ``Retry-After``, before their body is read.
+
+    A request's deadline comes from the ``X-Request-Timeout-Ms`` header
+    (or ``default_timeout_ms``), counted from arrival. It is stored as
+    ``request.state.deadline`` (a ``perf_counter`` value) so later stages
+    can drop the work; a request still queued at its deadline gets 504.
+    When it got its slot is stored as ``request.state.admitted_at``, so
+    stages timed after admission leave the queue wait out.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Collection[str],
+        max_concurrency: int = 64,
+        max_queue: int = 256,
+        default_timeout_ms: float = 0.0,
+        retry_after_seconds: int = 1,
+        meter=None,
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.default_timeout_ms = default_timeout_ms
+        self.retry_after_seconds = retry_after_seconds
+        self._active = 0
+        self._waiters: deque = deque()
+
+        self._depth = self._running = self._wait_ms = self._rejected = None
+        if meter is not None:
+            self._depth = meter.create_up_down_counter(
+                "api_admission_queue_depth", description="Requests waiting for an admission slot"
+            )
+            self._running = meter.create_up_down_counter(
+                "api_admission_active", description="Admitted requests currently running"
+            )
+            self._wait_ms = meter.create_histogram(
+                "api_admission_wait", unit="ms", description="Time an admitted request waited for a slot"
+            )
+            self._rejected = meter.create_counter(
+                "api_admission_rejected", description="Requests turned away, by reason"
+            )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        state = scope.setdefault("state", {})
+        arrived = state.get("received_at", perf_counter())
+        try:
+            deadline = self._deadline(scope, arrived)
+        except ValueError:
+            response = JSONResponse({"detail": f"Invalid {DEADLINE_HEADER} header"}, status_code=400)
+            return await response(scope, receive, send)
+        state["deadline"] = deadline
+
+        try:
+            await self._acquire(deadline)
+        except _Overloaded:
+            self._reject("overloaded")
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            return await response(scope, receive, send)
+        except DeadlineExceeded:
+            self._reject("deadline")
+            response = JSONResponse({"detail": "Request deadline exceeded while queued"}, status_code=504)
+            return await response(scope, receive, send)
+
+        state["admitted_at"] = perf_counter()
+        if self._wait_ms is not None:
+            self._wait_ms.record((state["admitted_at"] - arrived) * 1000)
+            self._running.add(1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if self._running is not None:
+                self._running.add(-1)
+            self._release()
+
+    def _deadline(self, scope, arrived: float) -> Optional[float]:
+        timeout_ms = self.default_timeout_ms
+        for name, value in scope.get("headers", ()):
+            if name == DEADLINE_HEADER.encode():
+                timeout_ms = float(value)
+                if timeout_ms != timeout_ms or timeout_ms <= 0:
+                    raise ValueError(value)
+                break
+        return arrived + timeout_ms / 1000 if timeout_ms else None
+
+    async def _acquire(self, deadline: Optional[float]) -> None:
+        check_deadline(deadline)
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise _Overloaded()
+
+        # A released slot is handed straight to the oldest waiter
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._count(self._depth, 1)
+        try:
+            timeout = None if deadline is None else deadline - perf_counter()
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded while queued")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+        finally:
+            self._count(self._depth, -1)
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+
+    def _release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _reject(self, reason: str) -> None:
+        if self._rejected is not None:
+            self._rejected.add(1, {"reason": reason})
+
+    @staticmethod
+    def _count(counter, n: int) -> None:
+        if counter is not None:
+            counter.add(n)
@@ -1,12 +1,19 @@
-from typing import List, Dict, Any, Optional
-from time import time
+from typing import List, Dict, Any, Hashable, Mapping, Optional, Tuple, get_args
+from time import time, perf_counter
+from functools import partial
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 
 import numpy as np
 import pandas as pd
-from fastapi import FastAPI, Body
+from fastapi import FastAPI, Body, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 import mlflow
+import mlflow.artifacts
 from mlflow.tracking import MlflowClient
 
 
@@ -17,11 +24,27 @@ from opentelemetry.exporter.prometheus import PrometheusMetricReader, start_http
 from pathlib import Path
 import joblib
 from minio import Minio
-from io import BytesIO
 from loguru import logger
 from dotenv import load_dotenv
 import os
 
+from .admission import AdmissionControl, DeadlineExceeded, check_deadline
+from .batching import MicroBatcher
+from .drift import BinLayout, DriftMonitor
+from .explain import Explainer
+from .executor import InferenceExecutor, limit_model_threads, threads_per_worker
+from .formats import UnsupportedMediaType, decode_records, read_columns, records_frame, to_frame
+from .jobs import JobRunner
+from .kernel import FusedTransform
+from .model_cache import ModelCache
+from .registry import ModelWatcher, ServingModel, VersionUnloaded
+from .result_cache import ResultCache, row_keys
+from .routing import ModelSpec, Router, ShadowMirror, parse_model_specs
+from .score_table import ScoreTableBuilder, row_confidence, row_entropy
+from .store import ApplicantStore
+from .telemetry import RequestTimer, Telemetry
+from .trees import PackedForest
+
 load_dotenv(override=False)
 
 access_key = os.getenv("MINIO_ACCESS_KEY")
@@ -40,63 +63,244 @@ minio_client = Minio(
     secure=False,
 )
 
+# Local SK_ID_CURR-indexed copy of the test set, refreshed when its ETag changes
+applicant_store = ApplicantStore(
+    minio_client,
+    bucket=os.getenv("SAMPLE_DATA_BUCKET", "sample-data"),
+    object_name=os.getenv("SAMPLE_DATA_OBJECT", "data/application_test.csv"),
+    refresh_interval=float(os.getenv("STORE_REFRESH_SECONDS", "60")),
+).start()
+
 local_path = Path(__file__).resolve().parents[1] / "joblib" / "transformer.joblib"
 docker_path = Path("/app/joblib/transformer.joblib")
 
-if local_path.exists():
-    transformer = joblib.load(local_path)
-elif docker_path.exists():
-    transformer = joblib.load(docker_path)
-else:
+def find_transformer() -> Path:
+    if os.getenv("TRANSFORMER_PATH"):
+        return Path(os.environ["TRANSFORMER_PATH"])
+    if local_path.exists():
+        return local_path
+    elif docker_path.exists():
+        return docker_path
     raise FileNotFoundError("transformer.joblib not found.")
 
+# ========== Inference executor ==============================
+inference_executor = InferenceExecutor(
+    kind=os.getenv("INFERENCE_EXECUTOR", "thread"),
+    workers=int(os.getenv("INFERENCE_WORKERS", "1")),
+)
 
-model_name = os.getenv("MODEL_NAME")
-model_type = os.getenv("MODEL_TYPE")
+# ========== Model registry ==================================
+# MODEL_ROUTES holds "name:type[:weight]" entries; the first one is the primary
+model_specs = parse_model_specs(
+    os.getenv("MODEL_ROUTES") or f"{os.getenv('MODEL_NAME')}:{os.getenv('MODEL_TYPE')}"
+)
+shadow_spec = (
+    parse_model_specs(os.environ["SHADOW_MODEL"])[0] if os.getenv("SHADOW_MODEL") else None
+)
+primary_name = model_specs[0].name
+router = Router(model_specs)
 
 mlflow_uri = os.getenv("MLFLOW_ENDPOINT")
 mlflow.set_tracking_uri(mlflow_uri)
 
 client = MlflowClient()
-versions = (
-    client.get_latest_versions(model_name, stages=["Production"])
-    or client.get_latest_versions(model_name, stages=["None"])
-)
 
-model_uri = f"models:/{model_name}/{versions[0].version}"
+# Downloaded models by content hash, so restarts and new replicas skip the registry
+model_cache = ModelCache(
+    os.getenv("MODEL_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "model_cache"))
+)
 
-if model_type == "xgb":
-    model = mlflow.xgboost.load_model(model_uri)
-elif model_type == "lgbm":
-    model = mlflow.lightgbm.load_model(model_uri)
-else:
-    raise ValueError(f"Unsupported model type: {model_type}")
+fused_transform_enabled = os.getenv("FUSED_TRANSFORM", "true").lower() == "true"
+packed_forest_enabled = os.getenv("PACKED_FOREST", "false").lower() == "true"
+packed_forest_max_rows = int(os.getenv("PACKED_FOREST_MAX_ROWS", "8"))
 
-logger.info(f"Loaded {model_type.upper()} model '{model_name}' from {model_uri}")
+def resolve_version(spec: ModelSpec) -> tuple:
+    """Key of what should be served: registry version plus the transformer file."""
+    stat = find_transformer().stat()
+    try:
+        versions = (
+            client.get_latest_versions(spec.name, stages=["Production"])
+            or client.get_latest_versions(spec.name, stages=["None"])
+        )
+        version = str(versions[0].version)
+    except Exception as e:
+        # Registry unreachable: start from the last cached version if there is one
+        version = model_cache.latest(spec.name) if not model_watchers[spec.name].ready else None
+        if version is None:
+            raise
+        logger.warning(f"Model registry unavailable ({e}), using cached version {version} of {spec.name}")
+    return (spec.name, version, stat.st_mtime_ns, stat.st_size)
+
+# One transformer (and compiled kernel) per file version, shared by every model
+transformers: Dict[tuple, tuple] = {}
+transformers_lock = Lock()
+
+def load_transformer(file_key: tuple) -> tuple:
+    with transformers_lock:
+        if file_key not in transformers:
+            transformer = joblib.load(find_transformer())
+
+            # Binning + selection compiled into one vectorized kernel; optbinning is the fallback
+            feature_kernel = None
+            if fused_transform_enabled:
+                try:
+                    feature_kernel = FusedTransform.compile(transformer)
+                except Exception as e:
+                    logger.warning(f"Fused transform unavailable, using optbinning: {e}")
+
+            transformers.clear()
+            transformers[file_key] = (transformer, feature_kernel)
+        return transformers[file_key]
+
+def load_packed_forest(model, local_model: Path) -> PackedForest:
+    # Node arrays are kept next to the cached model and memory-mapped, so
+    # pre-forked workers and replicas on one node share a single copy
+    path = model_cache.root / "packed" / Path(local_model).name
+    if not (path / "meta.json").exists():
+        PackedForest.from_model(model).save(path)
+    packed_forest = PackedForest.load(path)
+    packed_forest.check(model)
+    return packed_forest
+
+def load_serving(spec: ModelSpec, key: tuple) -> ServingModel:
+    name, version = key[0], key[1]
+    model_uri = f"models:/{name}/{version}"
+
+    if spec.model_type == "xgb":
+        flavor = mlflow.xgboost
+    elif spec.model_type == "lgbm":
+        flavor = mlflow.lightgbm
+    else:
+        raise ValueError(f"Unsupported model type: {spec.model_type}")
+
+    local_model = model_cache.fetch(
+        name,
+        version,
+        lambda dst: mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=dst),
+    )
+    model = flavor.load_model(str(local_model))
+
+    logger.info(f"Loaded {spec.model_type.upper()} model '{name}' from {model_uri}")
+    limit_model_threads(model, inference_executor.model_threads)
+    transformer, feature_kernel = load_transformer(key[2:])
+
+    # Small batches skip the sklearn wrapper and walk the flattened trees in numpy
+    packed_forest = None
+    if packed_forest_enabled:
+        try:
+            packed_forest = load_packed_forest(model, local_model)
+            logger.info(f"Packed forest enabled for batches <= {packed_forest_max_rows} rows")
+        except Exception as e:
+            packed_forest = None
+            logger.warning(f"Packed forest unavailable, using {spec.model_type} predict_proba: {e}")
+
+    return ServingModel(
+        key=key,
+        name=name,
+        version=version,
+        model_uri=model_uri,
+        model=model,
+        transformer=transformer,
+        feature_kernel=feature_kernel,
+        packed_forest=packed_forest,
+        packed_forest_max_rows=packed_forest_max_rows,
+    )
+
+def warmup_frames() -> List[pd.DataFrame]:
+    # Real rows when the applicant store is loaded, otherwise all-missing rows
+    snapshot = applicant_store.snapshot
+    if snapshot is not None and len(snapshot.frame):
+        return [snapshot.frame.iloc[:n] for n in (1, 8, 256)]
+    empty = pd.DataFrame([{name: np.nan for name in COLUMN_TYPES}])
+    return [pd.concat([empty] * n, ignore_index=True) for n in (1, 8, 256)]
+
+model_watchers: Dict[str, ModelWatcher] = {
+    spec.name: ModelWatcher(
+        partial(resolve_version, spec),
+        partial(load_serving, spec),
+        warmup_fn=warmup_frames,
+        poll_interval=(
+            float(os.getenv("MODEL_POLL_SECONDS", "60"))
+            if os.getenv("MODEL_WATCH_ENABLED", "true").lower() == "true"
+            else None
+        ),
+    )
+    for spec in model_specs + ([shadow_spec] if shadow_spec is not None else [])
+}
 
 # ========== OpenTelemetry gauges ===========================
 reader = PrometheusMetricReader()
 provider = MeterProvider(metric_readers=[reader])
 metrics.set_meter_provider(provider)
 meter = metrics.get_meter_provider().get_meter("prediction_api")
-start_http_server(port=8001, addr="0.0.0.0")
 
-last_avg_entropy = 0.0
-last_avg_confidence = 0.0
+# Per-stage latency, request sizes and per-row entropy / confidence histograms
+telemetry = Telemetry(meter)
+
+def observe_model_version(opts):
+    observations = []
+    for watcher in model_watchers.values():
+        if watcher.ready:
+            serving = watcher.active
+            version = int(serving.version) if serving.version.isdigit() else -1
+            observations.append(
+                metrics.Observation(version, {"model_name": serving.name, "model_uri": serving.model_uri})
+            )
+    return observations
 
 meter.create_observable_gauge(
-    name="api_prediction_entropy",
-    callbacks=[lambda opts: [metrics.Observation(last_avg_entropy)]],
-    description="Average prediction entropy",
+    name="api_model_version",
+    callbacks=[observe_model_version],
+    description="Registry version of the model currently serving",
 )
-meter.create_observable_gauge(
-    name="api_avg_confidence",
-    callbacks=[lambda opts: [metrics.Observation(last_avg_confidence)]],
-    description="Average model confidence",
+model_reloads = meter.create_counter(
+    name="api_model_reloads",
+    description="Model versions swapped in without a restart",
+)
+model_latency = meter.create_histogram(
+    name="api_model_latency",
+    unit="ms",
+    description="Time to score one request, per model and role",
+)
+model_score = meter.create_histogram(
+    name="api_model_score",
+    description="Decline probability per scored row, per model and role",
 )
 
+def record_model(name: str, role: str, elapsed_ms: float, proba: np.ndarray) -> None:
+    attributes = {"model_name": name, "role": role}
+    model_latency.record(elapsed_ms, attributes)
+    # Evenly spaced sample so large payloads stay cheap on the event loop
+    step = max(1, len(proba) // 256)
+    for p in proba[::step, 1]:
+        model_score.record(float(p), attributes)
+
 # ========== FastAPI ========================================
 app = FastAPI()
+retry_after_seconds = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+# Bounded work for the prediction endpoints; RequestTimer (added last) wraps it
+app.add_middleware(
+    AdmissionControl,
+    paths=("/Prediction", "/Prediction-columnar", "/Prediction-by-id")
+    if os.getenv("ADMISSION_ENABLED", "true").lower() == "true" else (),
+    max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "256")),
+    default_timeout_ms=float(os.getenv("REQUEST_TIMEOUT_MS", "0")),
+    retry_after_seconds=retry_after_seconds,
+    meter=meter,
+)
+app.add_middleware(RequestTimer, telemetry=telemetry)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=504)
+
+@app.exception_handler(VersionUnloaded)
+async def version_unloaded(request: Request, exc: VersionUnloaded) -> JSONResponse:
+    # Queued across two swaps; a retry is routed to the current version
+    return JSONResponse(
+        {"detail": str(exc)}, status_code=503, headers={"Retry-After": str(retry_after_seconds)}
+    )
 
 class RawItem(BaseModel):
     SK_ID_CURR: Optional[int] = None
@@ -224,105 +428,492 @@ class RawItem(BaseModel):
     class Config:
         extra = "ignore"
 
-def entropy(p: np.ndarray) -> float:
-    return float(-np.sum(p * np.log2(p + 1e-10)))
-
-def confidence(p: np.ndarray) -> float:
-    return float(p.max())
-
-@app.get("/")
-def health() -> Dict[str, str]:
-    return {"status": "ok"}
-
-@app.post("/Prediction")
-async def predict(items: List[RawItem] = Body(...)) -> Dict[str, Any]:
-    global last_avg_entropy, last_avg_confidence
-    t0 = time()
-    df_raw = pd.DataFrame([i.dict() for i in items]).replace({None: np.nan})
-
-    binning = transformer["binning_process"]
-    selector = transformer["selector"]
-
-    df_raw = df_raw[[col for col in df_raw.columns if col in binning.variable_names]]
-
-    # pipeline
-    X_binned = binning.transform(df_raw)
-    X = selector.transform(X_binned)
+# Column -> python type, used to validate columnar payloads once per column
+COLUMN_TYPES = {name: get_args(hint)[0] for name, hint in RawItem.__annotations__.items()}
+# RawItem stays the documented contract; only the columns the loaded models read are parsed
+RAW_ITEMS_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"type": "array", "items": RawItem.schema()}}},
+    }
+}
+# Smaller bodies are decoded on the event loop, larger ones in the threadpool
+INLINE_PARSE_BYTES = 64 * 1024
+
+def predict_frame(name: str, df_raw: pd.DataFrame) -> np.ndarray:
+    return model_watchers[name].active.predict_proba(df_raw)
+
+def predict_frame_timed(
+    name: str, df_raw: pd.DataFrame, key: Optional[Hashable] = None
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    # Timings travel back with the result so process-pool workers report them too.
+    # ``key`` pins the version the request was routed to; it is passed instead
+    # of the model so process-pool workers look up their inherited copy.
+    watcher = model_watchers[name]
+    serving = watcher.active if key is None else watcher.get(key)
+    timings: Dict[str, float] = {}
+    return serving.predict_proba(df_raw, timings), timings
+
+def routed_model(sticky_key=None) -> Optional[ServingModel]:
+    name = router.choose(lambda n: model_watchers[n].ready, sticky_key)
+    return None if name is None else model_watchers[name].active
+
+def current_model(sticky_key=None) -> ServingModel:
+    """The routed model for this request; 503 until one is loaded."""
+    serving = routed_model(sticky_key)
+    if serving is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded yet")
+    return serving
+
+def sticky_key(applicant_id) -> Optional[int]:
+    # Keep an applicant on one model across retries; routed on the first SK_ID_CURR
+    try:
+        return None if pd.isna(applicant_id) else int(applicant_id)
+    except (TypeError, ValueError):
+        return None
 
-    proba = model.predict_proba(X)
+def first_applicant(columns: Mapping[str, Any]):
+    return next(iter(columns.get("SK_ID_CURR", ())), None)
 
+def respond(
+    proba: np.ndarray, entropies: np.ndarray, confidences: np.ndarray, t0: float, serving: ServingModel
+) -> Dict[str, Any]:
     preds = np.argmax(proba, axis=1)
-
-    entropies = [entropy(p) for p in proba]
-    confidences = [confidence(p) for p in proba]
-
-    last_avg_entropy = float(np.mean(entropies))
-    last_avg_confidence = float(np.mean(confidences))
+    telemetry.predictions(entropies, confidences)
 
     return {
         "inference_time_ms": round((time() - t0) * 1000, 2),
+        "model_name": serving.name,
+        "model_version": serving.version,
         "predictions": [
             {
                 "result": "Accept" if y == 0 else "Decline",
                 "prob_accept": float(p[0]),
                 "prob_decline": float(p[1]),
-                "entropy": round(e, 4),
-                "confidence": round(c, 4),
+                "entropy": round(float(e), 4),
+                "confidence": round(float(c), 4),
             }
             for y, p, e, c in zip(preds, proba, entropies, confidences)
         ],
         "metrics": {
-            "avg_entropy": last_avg_entropy,
-            "avg_confidence": last_avg_confidence,
+            "avg_entropy": float(np.mean(entropies)),
+            "avg_confidence": float(np.mean(confidences)),
         },
     }
 
-@app.post("/Prediction-by-id")
-def predict_by_id(id: int) -> Dict[str, Any]:
-    global last_avg_entropy, last_avg_confidence
+async def predict_rows(
+    name: str, df_raw: pd.DataFrame, deadline: Optional[float] = None, key: Optional[Hashable] = None
+) -> np.ndarray:
+    if batching_enabled:
+        return await batchers[name].submit(df_raw, deadline, key)
+    check_deadline(deadline)
+    proba, timings = await inference_executor.run(predict_frame_timed, name, df_raw, key)
+    if name in routed_names:
+        telemetry.stages(timings)
+    return proba
+
+async def cached_predict(
+    df_raw: pd.DataFrame, serving: ServingModel, deadline: Optional[float] = None
+) -> np.ndarray:
+    compute = partial(predict_rows, serving.name, deadline=deadline, key=serving.key)
+    if result_cache is None:
+        return await compute(df_raw)
+    numeric, categorical = serving.input_columns
+    if any(col not in df_raw.columns for col in numeric + categorical):
+        # Let the transform report the missing columns
+        return await compute(df_raw)
+    try:
+        digests = row_keys(df_raw, numeric, categorical)
+    except (TypeError, ValueError):
+        return await compute(df_raw)
+    keys = [(serving.key, digest) for digest in digests]
+    return await result_cache.resolve(df_raw, keys, compute)
+
+async def infer_frame(
+    df_raw: pd.DataFrame, t0: float, deadline: Optional[float] = None, serving: Optional[ServingModel] = None
+) -> Dict[str, Any]:
+    # Model and version are picked when the request is parsed (``serving``);
+    # a swap only affects later requests
+    if serving is None:
+        serving = current_model(sticky_key(first_applicant(df_raw)))
+    check_deadline(deadline)
+    t_model = perf_counter()
+    proba = await cached_predict(df_raw, serving, deadline)
+    role = "primary" if serving.name == primary_name else "canary"
+    record_model(serving.name, role, (perf_counter() - t_model) * 1000, proba)
+    if shadow is not None:
+        shadow.maybe_mirror(df_raw, proba)
+    if drift_monitor is not None:
+        drift_monitor.observe(df_raw)
+    return respond(proba, row_entropy(proba), row_confidence(proba), t0, serving)
+
+async def infer(
+    df_raw: pd.DataFrame, deadline: Optional[float] = None, serving: Optional[ServingModel] = None
+) -> Dict[str, Any]:
+    """Score a parsed ``/Prediction`` payload; timed from here, as when FastAPI parsed it."""
+    return await infer_frame(df_raw, time(), deadline, serving)
+
+request_schemas: Dict[Tuple, Dict[str, type]] = {}
+
+def request_schema(serving: Optional[ServingModel]) -> Dict[str, type]:
+    """
+    Columns read by ``serving`` and the shadow model it is mirrored to,
+    typed as their binning expects (``ServingModel.raw_schema``). All of
+    ``RawItem`` until a model is loaded.
+    """
+    if serving is None:
+        return COLUMN_TYPES
+    models = [serving]
+    if shadow_spec is not None and model_watchers[shadow_spec.name].ready:
+        models.append(model_watchers[shadow_spec.name].active)
+    key = tuple(m.key for m in models)
+    schema = request_schemas.get(key)
+    if schema is None:
+        schema = {"SK_ID_CURR": COLUMN_TYPES["SK_ID_CURR"]}
+        for m in models:
+            schema.update(m.raw_schema)
+        # Forget versions that have been swapped out
+        active = {w.active.key for w in model_watchers.values() if w.ready}
+        for stale in [k for k in request_schemas if not active.issuperset(k)]:
+            request_schemas.pop(stale, None)
+        request_schemas[key] = schema
+    return schema
+
+def parse_records(body: bytes) -> Tuple[pd.DataFrame, Optional[ServingModel], float, float]:
+    """
+    The frame, the model it was routed to and parsed for, when decoding
+    ended and how long building the frame took.
+    """
+    rows = decode_records(body)
+    decoded_at = perf_counter()
+    serving = routed_model(sticky_key(rows[0].get("SK_ID_CURR")))
+    df_raw = records_frame(rows, request_schema(serving))
+    return df_raw, serving, decoded_at, perf_counter() - decoded_at
+
+def parse_columns(body: bytes, content_type: Optional[str]) -> Tuple[pd.DataFrame, Optional[ServingModel]]:
+    columns = read_columns(body, content_type)
+    serving = routed_model(sticky_key(first_applicant(columns)))
+    return to_frame(columns, request_schema(serving)), serving
+
+async def read_records(request: Request) -> Tuple[pd.DataFrame, Optional[ServingModel]]:
+    body = await request.body()
+    try:
+        if len(body) <= INLINE_PARSE_BYTES:
+            df_raw, serving, decoded_at, frame_seconds = parse_records(body)
+        else:
+            df_raw, serving, decoded_at, frame_seconds = await run_in_threadpool(parse_records, body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    parsed(request, decoded_at)
+    telemetry.stage("frame", frame_seconds)
+    return df_raw, serving
+
+def infer_by_id(id: int) -> Dict[str, Any]:
     t0 = time()
+    serving = current_model(id)
+    snapshot = applicant_store.snapshot
+    if snapshot is not None and serving.name == primary_name:
+        table = score_tables.get(score_table_key(snapshot, serving))
+        if table is not None:
+            pos = table.position(id)
+            if pos is None:
+                raise HTTPException(status_code=404, detail=f"ID {id} not found")
+            sl = slice(pos, pos + 1)
+            return respond(table.proba[sl], table.entropy[sl], table.confidence[sl], t0, serving)
 
     try:
-        response = minio_client.get_object("sample-data", "data/application_test.csv")
-        df_all = pd.read_csv(BytesIO(response.read()))
-    except Exception as e:
-        raise RuntimeError(f"Failed to fetch test data from MinIO: {str(e)}")
+        df_row = applicant_store.lookup(id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if df_row is None:
+        raise HTTPException(status_code=404, detail=f"ID {id} not found")
+    proba, timings = inference_executor.call(predict_frame_timed, serving.name, df_row, serving.key)
+    telemetry.stages(timings)
+    return respond(proba, row_entropy(proba), row_confidence(proba), t0, serving)
+
+# ========== Micro-batching for /Prediction =================
+batching_enabled = os.getenv("BATCH_ENABLED", "true").lower() == "true"
+# One batcher per model: rows of different models are never coalesced
+routed_names = {spec.name for spec in model_specs}
+batchers: Dict[str, MicroBatcher] = {
+    name: MicroBatcher(
+        partial(predict_frame_timed, name),
+        max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "256")),
+        max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "2")),
+        executor=inference_executor,
+        max_concurrency=inference_executor.workers,
+        meter=meter if name == primary_name else None,
+        on_stats=telemetry.stages if name in routed_names else None,
+    )
+    for name in model_watchers
+}
+
+# ========== Shadow traffic ==================================
+shadow = None
+if shadow_spec is not None:
+    shadow = ShadowMirror(
+        shadow_spec.name,
+        partial(predict_rows, shadow_spec.name),
+        sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+        max_pending=int(os.getenv("SHADOW_MAX_PENDING", "64")),
+        record=record_model,
+        meter=meter,
+    )
+
+# ========== Result cache for repeated payloads ===============
+result_cache = None
+if os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true":
+    result_cache = ResultCache(
+        max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "100000")),
+        ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+        meter=meter,
+    )
+
+# ========== Explanations with a bounded cost =================
+# Own pool, so explanations never hold up the prediction executor
+explain_pool = ThreadPoolExecutor(max_workers=int(os.getenv("EXPLAIN_WORKERS", "1")), thread_name_prefix="explain")
+explain_max_rows = int(os.getenv("EXPLAIN_MAX_ROWS", "100"))
+explain_budget_seconds = float(os.getenv("EXPLAIN_BUDGET_MS", "500")) / 1000
+explain_max_pending = int(os.getenv("EXPLAIN_MAX_PENDING", "8"))
+explain_pending = 0
+explainers: Dict[Hashable, Explainer] = {}
+# Contributions per row, keyed like the result cache and cleared on swap
+contribution_cache = ResultCache(
+    max_entries=int(os.getenv("EXPLAIN_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+)
 
-    df_row = df_all[df_all["SK_ID_CURR"] == id]
-    if df_row.empty:
-        return {"error": f"ID {id} not found"}
+def explainer_for(serving: ServingModel) -> Explainer:
+    if serving.key not in explainers:
+        explainers.clear()
+        explainers[serving.key] = Explainer.for_serving(serving)
+    return explainers[serving.key]
+
+def contributions_before(deadline: float, serving: ServingModel, df_raw: pd.DataFrame) -> np.ndarray:
+    # Work still queued when its request gave up is skipped
+    if perf_counter() > deadline:
+        raise TimeoutError("Explanation budget exceeded while queued")
+    return serving.contributions(df_raw)
+
+async def infer_explanations(items: List[RawItem], top_k: Optional[int]) -> Dict[str, Any]:
+    global explain_pending
+    if len(items) > explain_max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {explain_max_rows} rows can be explained per request")
+    if explain_pending >= explain_max_pending:
+        raise HTTPException(status_code=429, detail="Too many explanations in progress")
 
-    binning = transformer["binning_process"]
-    selector = transformer["selector"]
+    t0 = time()
+    df_raw = pd.DataFrame([i.dict() for i in items]).replace({None: np.nan})
+    serving = current_model(sticky_key(first_applicant(df_raw)))
+    deadline = perf_counter() + explain_budget_seconds
+    loop = asyncio.get_running_loop()
 
-    df_row = df_row[[col for col in df_row.columns if col in binning.variable_names]]
+    async def compute(df: pd.DataFrame) -> np.ndarray:
+        return await loop.run_in_executor(explain_pool, contributions_before, deadline, serving, df)
 
-    X_binned = binning.transform(df_row)
-    X = selector.transform(X_binned)
+    numeric, categorical = serving.input_columns
+    keys = [(serving.key, digest) for digest in row_keys(df_raw, numeric, categorical)]
+    explain_pending += 1
+    try:
+        contributions = await asyncio.wait_for(
+            contribution_cache.resolve(df_raw, keys, compute), timeout=explain_budget_seconds
+        )
+    except (asyncio.TimeoutError, TimeoutError):
+        raise HTTPException(status_code=503, detail="Explanation exceeded its time budget")
+    finally:
+        explain_pending -= 1
 
-    proba = model.predict_proba(X)
-    preds = np.argmax(proba, axis=1)
+    return {
+        "inference_time_ms": round((time() - t0) * 1000, 2),
+        "model_name": serving.name,
+        "model_version": serving.version,
+        "explanations": explainer_for(serving).explain(df_raw, contributions, top_k),
+    }
+
+# ========== Bulk scoring jobs over object-store files ========
+job_runner = JobRunner(
+    minio_client,
+    current_model,
+    workers=int(os.getenv("JOBS_WORKERS", "1")),
+    chunk_rows=int(os.getenv("JOBS_CHUNK_ROWS", "50000")),
+    meter=meter,
+)
 
-    entropies = [entropy(p) for p in proba]
-    confidences = [confidence(p) for p in proba]
+class JobRequest(BaseModel):
+    bucket: str
+    object_name: str
+    output_bucket: Optional[str] = None
+    output_object: Optional[str] = None
+
+# ========== Precomputed scores for the known test set =======
+score_table_enabled = os.getenv("SCORE_TABLE_ENABLED", "false").lower() == "true"
+score_tables = ScoreTableBuilder(partial(predict_frame, primary_name))
+
+def score_table_key(snapshot, serving: ServingModel) -> tuple:
+    # Scores depend on the data snapshot, the model version and the transformer file
+    return (snapshot.etag, serving.key)
+
+def rebuild_score_table(snapshot, serving: ServingModel) -> None:
+    score_tables.rebuild(snapshot.frame, score_table_key(snapshot, serving), serving.predict_proba)
+
+def on_snapshot(snapshot) -> None:
+    if model_watchers[primary_name].ready:
+        rebuild_score_table(snapshot, model_watchers[primary_name].active)
+
+if score_table_enabled:
+    applicant_store.add_listener(on_snapshot)
+
+# ========== Input drift against the training bins ===========
+drift_monitor = None
+if os.getenv("DRIFT_MONITOR_ENABLED", "true").lower() == "true":
+    drift_monitor = DriftMonitor(
+        window_seconds=float(os.getenv("DRIFT_WINDOW_SECONDS", "3600")),
+        buckets=int(os.getenv("DRIFT_WINDOW_BUCKETS", "12")),
+        min_rows=int(os.getenv("DRIFT_MIN_ROWS", "500")),
+        meter=meter,
+    )
+
+def reset_drift_monitor(serving: ServingModel) -> None:
+    try:
+        drift_monitor.reset(BinLayout.from_transformer(serving.transformer))
+    except Exception as e:
+        drift_monitor.reset(None)
+        logger.warning(f"Drift monitor disabled for this transformer: {e}")
+
+def on_model_swap(serving: ServingModel, previous: Optional[ServingModel]) -> None:
+    if previous is not None:
+        model_reloads.add(1, {"model_name": serving.name, "model_uri": serving.model_uri})
+        if result_cache is not None:
+            result_cache.clear()
+        contribution_cache.clear()
+    # Forked workers hold a copy of the old model
+    if inference_executor.kind == "process":
+        inference_executor.restart()
+    # Counts are only comparable under the transformer they were binned with
+    if drift_monitor is not None and serving.name == primary_name and (
+        previous is None or previous.transformer is not serving.transformer
+    ):
+        reset_drift_monitor(serving)
+    snapshot = applicant_store.snapshot
+    if score_table_enabled and snapshot is not None and serving.name == primary_name:
+        rebuild_score_table(snapshot, serving)
+
+# Loading happens in the background; /ready flips once the routed models are warm
+for watcher in model_watchers.values():
+    watcher.add_listener(on_model_swap)
+    watcher.start()
+
+@app.on_event("startup")
+async def startup() -> None:
+    start_http_server(port=int(os.getenv("METRICS_PORT", "8001")), addr="0.0.0.0")
+
+def prepare_fork() -> None:
+    """Stop background threads so a pre-fork parent can fork safely."""
+    for watcher in model_watchers.values():
+        watcher.stop()
+    applicant_store.stop()
+
+def after_fork(workers: int = 1) -> None:
+    """
+    Restart background threads in a pre-forked worker; models are inherited,
+    not reloaded. The parent polls the registry and re-forks the workers on
+    a new version, so workers only load models that were not ready yet.
+    """
+    # The cores are shared by all pre-forked workers
+    inference_executor.model_threads = threads_per_worker(inference_executor.workers * workers)
+    for watcher in model_watchers.values():
+        if watcher.ready:
+            limit_model_threads(watcher.active.model, inference_executor.model_threads)
+        else:
+            watcher.start()
+    applicant_store.start(initial_delay=applicant_store.refresh_interval if applicant_store.ready else 0.0)
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    for batcher in batchers.values():
+        await batcher.stop()
+    for watcher in model_watchers.values():
+        watcher.stop()
+    applicant_store.stop()
+    job_runner.shutdown()
+    explain_pool.shutdown(wait=False, cancel_futures=True)
+    inference_executor.shutdown()
 
-    last_avg_entropy = float(np.mean(entropies))
-    last_avg_confidence = float(np.mean(confidences))
+@app.get("/")
+def health() -> Dict[str, str]:
+    return {"status": "ok"}
 
+@app.get("/ready")
+def ready() -> Dict[str, Any]:
+    loading = [spec.name for spec in model_specs if not model_watchers[spec.name].ready]
+    if loading:
+        raise HTTPException(status_code=503, detail=f"Models still loading: {loading}")
     return {
-        "inference_time_ms": round((time() - t0) * 1000, 2),
-        "predictions": [
-            {
-                "result": "Accept" if y == 0 else "Decline",
-                "prob_accept": float(p[0]),
-                "prob_decline": float(p[1]),
-                "entropy": round(e, 4),
-                "confidence": round(c, 4),
-            }
-            for y, p, e, c in zip(preds, proba, entropies, confidences)
-        ],
-        "metrics": {
-            "avg_entropy": last_avg_entropy,
-            "avg_confidence": last_avg_confidence,
-        },
+        "status": "ready",
+        "models": {name: w.active.version for name, w in model_watchers.items() if w.ready},
     }
+
+def deadline_of(request: Request) -> Optional[float]:
+    # Set by AdmissionControl from X-Request-Timeout-Ms
+    return getattr(request.state, "deadline", None)
+
+def parsed(request: Request, until: Optional[float] = None) -> None:
+    # From admission (or arrival, on paths without it) until the body is read and validated
+    started = getattr(request.state, "admitted_at", None) or getattr(request.state, "received_at", None)
+    if started is not None:
+        telemetry.stage("parse", (until or perf_counter()) - started)
+
+def json_response(payload: Dict[str, Any]) -> JSONResponse:
+    t0 = perf_counter()
+    response = JSONResponse(payload)
+    telemetry.stage("serialize", perf_counter() - t0)
+    return response
+
+@app.post("/Prediction", openapi_extra=RAW_ITEMS_BODY)
+async def predict(request: Request) -> Dict[str, Any]:
+    """A JSON array of ``RawItem`` objects; fields the models do not read are skipped."""
+    df_raw, serving = await read_records(request)
+    return json_response(await infer(df_raw, deadline_of(request), serving))
+
+@app.post("/Prediction-columnar")
+async def predict_columnar(request: Request) -> Dict[str, Any]:
+    """
+    Column-major input: JSON object of column -> values, an Arrow IPC stream
+    or a MessagePack map of column -> values / .npy buffers.
+    """
+    t0 = time()
+    body = await request.body()
+    try:
+        df_raw, serving = await run_in_threadpool(
+            parse_columns, body, request.headers.get("content-type")
+        )
+    except UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    parsed(request)
+    return json_response(await infer_frame(df_raw, t0, deadline_of(request), serving))
+
+@app.post("/Explanation")
+async def explanation(items: List[RawItem] = Body(...), top_k: Optional[int] = Query(None, ge=1)) -> Dict[str, Any]:
+    """Tree SHAP contributions per raw field, largest first; ``top_k`` keeps the first k."""
+    return json_response(await infer_explanations(items, top_k))
+
+@app.post("/Prediction-by-id")
+def predict_by_id(request: Request, id: int) -> Dict[str, Any]:
+    check_deadline(deadline_of(request))
+    return json_response(infer_by_id(id))
+
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest) -> Dict[str, Any]:
+    """Score a CSV or Parquet object in the background; poll ``/jobs/{job_id}``."""
+    current_model()  # 503 until a model is loaded
+    job = job_runner.submit(request.bucket, request.object_name, request.output_bucket, request.output_object)
+    return job.status()
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str) -> Dict[str, Any]:
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.status()
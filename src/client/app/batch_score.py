@@ -0,0 +1,169 @@
+"""
+Offline batch scoring with the same transformer and model the API serves.
+
+    cd src/client
+    python -m app.batch_score application_test.csv scores.parquet \\
+        --model-uri models:/xgb_model/3 --model-type xgb --workers 8
+
+Input is read in chunks (CSV or Parquet) and every chunk is scored in a
+forked worker. Workers inherit the loaded model and transformer from the
+parent, so they share its read-only memory instead of loading copies.
+Results are written to Parquet in input order.
+"""
+import argparse
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import time
+from typing import Iterator, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .executor import available_cpus, limit_model_threads, threads_per_worker
+from .jobs import prediction_table
+from .kernel import FusedTransform
+from .registry import ServingModel
+
+# Set before the pool forks; workers only read it
+_serving: Optional[ServingModel] = None
+
+
+def _score_chunk(df: pd.DataFrame) -> np.ndarray:
+    return _serving.predict_proba(df)
+
+
+def load_serving(model_uri: str, model_type: str, transformer_path: Path, model_threads: int = 1) -> ServingModel:
+    import mlflow
+
+    if model_type == "xgb":
+        flavor = mlflow.xgboost
+    elif model_type == "lgbm":
+        flavor = mlflow.lightgbm
+    else:
+        raise ValueError(f"Unsupported model type: {model_type}")
+
+    model = flavor.load_model(model_uri)
+    limit_model_threads(model, model_threads)
+    transformer = joblib.load(transformer_path)
+    try:
+        feature_kernel = FusedTransform.compile(transformer)
+    except Exception as e:
+        feature_kernel = None
+        logger.warning(f"Fused transform unavailable, using optbinning: {e}")
+
+    if model_uri.startswith("models:/"):
+        name, version = model_uri[len("models:/"):].rsplit("/", 1)
+    else:
+        name, version = Path(model_uri).name, "local"
+    return ServingModel(
+        key=(model_uri, str(transformer_path)),
+        name=name,
+        version=version,
+        model_uri=model_uri,
+        model=model,
+        transformer=transformer,
+        feature_kernel=feature_kernel,
+    )
+
+
+def read_chunks(path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(path, chunksize=chunk_rows) as chunks:
+            yield from chunks
+
+
+def score_file(
+    serving: ServingModel,
+    input_path: Path,
+    output_path: Path,
+    workers: int = 1,
+    chunk_rows: int = 50_000,
+    id_column: str = "SK_ID_CURR",
+) -> int:
+    """Score ``input_path`` into ``output_path``; returns the number of rows."""
+    import pyarrow.parquet as pq
+
+    global _serving
+    _serving = serving
+    variables = set(serving.transformer["binning_process"].variable_names)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("fork"))
+    # At most two chunks per worker are read ahead, so memory stays bounded
+    pending: deque = deque()
+    writer = None
+    rows = 0
+
+    def write_oldest() -> None:
+        nonlocal writer, rows
+        ids, result = pending.popleft()
+        proba = result.result() if pool is not None else result
+        table = prediction_table(proba, ids, id_column)
+        if writer is None:
+            writer = pq.ParquetWriter(str(output_path), table.schema)
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        rows += len(proba)
+
+    try:
+        for chunk in read_chunks(input_path, chunk_rows):
+            ids = chunk[id_column].to_numpy() if id_column in chunk.columns else None
+            # Only ship the columns the transformer reads to the workers
+            chunk = chunk[[c for c in chunk.columns if c in variables]]
+            if pool is not None:
+                pending.append((ids, pool.submit(_score_chunk, chunk)))
+            else:
+                pending.append((ids, _score_chunk(chunk)))
+            while len(pending) >= 2 * max(1, workers):
+                write_oldest()
+        while pending:
+            write_oldest()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="CSV or Parquet file")
+    parser.add_argument("output", type=Path, help="Parquet file to write")
+    parser.add_argument("--model-uri", required=True, help="e.g. models:/xgb_model/3 or a local model directory")
+    parser.add_argument("--model-type", choices=["xgb", "lgbm"], default=os.getenv("MODEL_TYPE", "xgb"))
+    parser.add_argument("--transformer", type=Path,
+                        default=Path(__file__).resolve().parents[1] / "joblib" / "transformer.joblib")
+    parser.add_argument("--tracking-uri", default=os.getenv("MLFLOW_ENDPOINT"))
+    parser.add_argument("--workers", type=int, default=available_cpus())
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--id-column", default="SK_ID_CURR")
+    args = parser.parse_args()
+
+    if args.tracking_uri:
+        import mlflow
+
+        mlflow.set_tracking_uri(args.tracking_uri)
+
+    t0 = time()
+    # Cores are split between workers so workers x model threads <= cores
+    serving = load_serving(args.model_uri, args.model_type, args.transformer, threads_per_worker(args.workers))
+    rows = score_file(serving, args.input, args.output, args.workers, args.chunk_rows, args.id_column)
+    elapsed = time() - t0
+    logger.info(f"Scored {rows} rows into {args.output} in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
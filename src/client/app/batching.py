@@ -0,0 +1,206 @@
+import asyncio
+from time import perf_counter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .admission import DeadlineExceeded, expired
+
+
+def predict_frames(
+    predict_fn: Callable[..., Any], frames: List[pd.DataFrame], key: Optional[Hashable] = None
+) -> Any:
+    # Module-level so it can be shipped to process-pool workers
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return predict_fn(df) if key is None else predict_fn(df, key)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into one vectorized call.
+
+    Requests are queued; the dispatcher takes the first one, then keeps
+    collecting until ``max_batch_size`` rows are pending or ``max_wait_ms``
+    has passed, runs ``predict_fn`` once on the concatenated frame and hands
+    each caller back its own slice of the result.
+
+    When an ``executor`` is given, inference runs on it instead of the event
+    loop and up to ``max_concurrency`` batches may be in flight at once.
+
+    ``predict_fn`` may also return ``(proba, stats)``; ``on_stats(stats)`` is
+    then called once per batch on the event loop.
+
+    If the coalesced call fails, its requests are retried one at a time, so
+    only the request that caused the error gets it.
+
+    Requests submitted with a ``deadline`` (a ``perf_counter`` value) that
+    has passed by the time their batch runs fail with ``DeadlineExceeded``
+    instead of being predicted.
+
+    Requests submitted with a ``key`` are only coalesced with requests of
+    the same key, and ``predict_fn(df, key)`` is called for them; the app
+    uses it to pin a request to the model version it was routed to.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[pd.DataFrame], np.ndarray],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+        executor=None,
+        max_concurrency: int = 1,
+        meter=None,
+        on_stats: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.predict_fn = predict_fn
+        self.on_stats = on_stats
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._batch_rows = self._batch_requests = self._wait_ms = self._predict_ms = None
+        self._in_flight = None
+        if meter is not None:
+            self._batch_rows = meter.create_histogram(
+                "api_batch_rows", unit="rows", description="Rows per coalesced inference call"
+            )
+            self._batch_requests = meter.create_histogram(
+                "api_batch_requests", unit="requests", description="Requests per coalesced inference call"
+            )
+            self._wait_ms = meter.create_histogram(
+                "api_batch_wait_ms", unit="ms", description="Time a request waited in the batching queue"
+            )
+            self._predict_ms = meter.create_histogram(
+                "api_batch_predict_ms", unit="ms", description="Duration of one coalesced inference call"
+            )
+            self._in_flight = meter.create_up_down_counter(
+                "api_batches_in_flight", description="Coalesced inference calls currently running"
+            )
+
+    async def submit(
+        self, df: pd.DataFrame, deadline: Optional[float] = None, key: Optional[Hashable] = None
+    ) -> np.ndarray:
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((df, future, perf_counter(), deadline, key))
+        return await future
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _collect(self) -> List[Tuple[pd.DataFrame, asyncio.Future, float, Optional[float], Any]]:
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = self._loop.time() + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            await self._slots.acquire()
+            self._loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch) -> None:
+        # A batch only mixes keys around a model swap; each key is run on its own
+        groups: Dict[Any, list] = {}
+        for item in self._live(batch):
+            groups.setdefault(item[4], []).append(item)
+        try:
+            for key, group in groups.items():
+                await self._predict(group, key)
+        finally:
+            self._slots.release()
+
+    async def _predict(self, batch, key) -> None:
+        frames = [item[0] for item in batch]
+        t0 = perf_counter()
+        if self._in_flight is not None:
+            self._in_flight.add(1)
+        try:
+            if self.executor is None:
+                proba = predict_frames(self.predict_fn, frames, key)
+            else:
+                proba = await self.executor.run(predict_frames, self.predict_fn, frames, key)
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad request fails the whole call; run each on its own so
+                # the error only reaches the caller that caused it
+                logger.warning(f"Batched inference failed ({e}), retrying {len(batch)} requests one by one")
+                for item in batch:
+                    await self._predict([item], key)
+                return
+            logger.exception("Batched inference failed")
+            if not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return
+        finally:
+            if self._in_flight is not None:
+                self._in_flight.add(-1)
+
+        if isinstance(proba, tuple):
+            proba, stats = proba
+            if self.on_stats is not None:
+                self.on_stats(stats)
+        self._record(batch, t0, proba)
+        offset = 0
+        for df, future, *_ in batch:
+            n = len(df)
+            if not future.done():
+                future.set_result(proba[offset:offset + n])
+            offset += n
+
+    def _live(self, batch):
+        # Callers that gave up or ran out of time are not predicted
+        live = []
+        for item in batch:
+            future, deadline = item[1], item[3]
+            if future.done():
+                continue
+            if expired(deadline):
+                future.set_exception(DeadlineExceeded("Request deadline exceeded before inference"))
+                continue
+            live.append(item)
+        return live
+
+    def _record(self, batch, t0: float, proba: np.ndarray) -> None:
+        if self._batch_rows is None:
+            return
+        now = perf_counter()
+        self._batch_rows.record(len(proba))
+        self._batch_requests.record(len(batch))
+        self._predict_ms.record((now - t0) * 1000)
+        for _, _, queued_at, *_ in batch:
+            self._wait_ms.record((t0 - queued_at) * 1000)
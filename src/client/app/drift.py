@@ -0,0 +1,223 @@
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from opentelemetry.metrics import Observation
+
+# Floor for bin shares so empty bins give a large but finite PSI
+PSI_EPSILON = 1e-4
+
+
+def _label(bin_) -> str:
+    # Categorical bins are arrays of their categories (ArrowStringArray under pandas 3)
+    if not isinstance(bin_, str) and not np.isscalar(bin_):
+        return "[" + ", ".join(map(str, np.asarray(bin_))) + "]"
+    return str(bin_)
+
+
+@dataclass(frozen=True)
+class FeatureBins:
+    """
+    Maps raw values of one variable to its optbinning bin.
+
+    Slots are the fitted bins, then missing, then (categorical only) unseen
+    categories. ``reference`` holds the training count per slot and
+    ``labels`` its binning-table description.
+    """
+
+    name: str
+    reference: np.ndarray
+    labels: Tuple[str, ...] = ()
+    splits: Optional[np.ndarray] = None
+    categories: Optional[pd.Index] = None
+    category_bins: Optional[np.ndarray] = None
+
+    @property
+    def slots(self) -> int:
+        return len(self.reference)
+
+    def bin_index(self, x: np.ndarray) -> np.ndarray:
+        if self.splits is not None:
+            x = np.asarray(x, dtype=np.float64)
+            idx = np.searchsorted(self.splits, x, side="right")
+            idx[np.isnan(x)] = len(self.splits) + 1
+            return idx
+        pos = self.categories.get_indexer(x)
+        idx = np.where(pos >= 0, self.category_bins[pos], self.slots - 1)
+        idx[pd.isnull(x)] = self.slots - 2
+        return idx
+
+
+class BinLayout:
+    """
+    Bin slots of every selected variable laid end to end, so one batch is
+    counted with a single ``np.bincount``.
+    """
+
+    def __init__(self, features: List[FeatureBins]):
+        self.features = features
+        self.offsets = np.cumsum([0] + [f.slots for f in features])
+        self.reference = np.concatenate([f.reference for f in features]).astype(np.float64)
+
+    @property
+    def slots(self) -> int:
+        return int(self.offsets[-1])
+
+    @classmethod
+    def from_transformer(cls, transformer: dict) -> "BinLayout":
+        """Training bin counts are read from the fitted BinningProcess binning tables."""
+        binning = transformer["binning_process"]
+        selector = transformer["selector"]
+        binned = np.asarray(binning.get_support(names=True))
+
+        features = []
+        for name in map(str, binned[selector.get_support()]):
+            optb = binning.get_binned_variable(name)
+            if type(optb).__name__ != "OptimalBinning" or optb.special_codes is not None:
+                logger.warning(f"Drift monitor skips {name}: {type(optb).__name__}")
+                continue
+            # Rows: one per bin, then Special, Missing and Totals
+            table = optb.binning_table.build()
+            counts = table["Count"].to_numpy()[:-1].astype(np.int64)
+            bins, missing = counts[:-2], counts[-1]
+            labels = tuple(_label(b) for b in table["Bin"].to_numpy()[:len(bins)]) + ("Missing",)
+            if optb.dtype == "numerical":
+                features.append(FeatureBins(
+                    name=name,
+                    reference=np.append(bins, missing),
+                    labels=labels,
+                    splits=np.asarray(optb.splits, dtype=np.float64),
+                ))
+            else:
+                categories = [c for b in optb.splits for c in b]
+                features.append(FeatureBins(
+                    name=name,
+                    reference=np.append(bins, [missing, 0]),
+                    labels=labels + ("Unknown",),
+                    categories=pd.Index(categories, dtype=object),
+                    category_bins=np.repeat(np.arange(len(optb.splits)), [len(b) for b in optb.splits]),
+                ))
+        return cls(features)
+
+    def count(self, df: pd.DataFrame) -> np.ndarray:
+        """Occupancy of every slot for the rows of ``df``; absent columns count nothing."""
+        parts = [
+            feature.bin_index(df[feature.name].to_numpy()) + offset
+            for feature, offset in zip(self.features, self.offsets)
+            if feature.name in df.columns
+        ]
+        if not parts:
+            return np.zeros(self.slots, dtype=np.int64)
+        return np.bincount(np.concatenate(parts), minlength=self.slots)
+
+    def psi(self, counts: np.ndarray) -> Dict[str, float]:
+        """Population stability index of ``counts`` against training, per variable."""
+        out = {}
+        for feature, start, end in zip(self.features, self.offsets[:-1], self.offsets[1:]):
+            actual = counts[start:end]
+            if not actual.sum():
+                continue
+            expected = self.reference[start:end]
+            p = np.maximum(actual / actual.sum(), PSI_EPSILON)
+            q = np.maximum(expected / expected.sum(), PSI_EPSILON)
+            out[feature.name] = float(np.sum((p - q) * np.log(p / q)))
+        return out
+
+
+class DriftMonitor:
+    """
+    Per-variable bin occupancy of live traffic over a sliding time window,
+    compared with the training distribution as PSI.
+
+    The window is ``buckets`` slices of ``window_seconds / buckets`` each;
+    the oldest slice is dropped as a new one starts. PSI is only reported
+    once the window holds ``min_rows`` rows. ``reset`` installs the layout
+    of a new transformer and forgets what was counted under the old one.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 3600.0,
+        buckets: int = 12,
+        min_rows: int = 500,
+        meter=None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.bucket_seconds = window_seconds / buckets
+        self.min_rows = min_rows
+        self.clock = clock
+        self.layout: Optional[BinLayout] = None
+        self._buckets: deque = deque(maxlen=buckets)
+        self._lock = Lock()
+
+        if meter is not None:
+            meter.create_observable_gauge(
+                "api_feature_psi",
+                callbacks=[self._observe_psi],
+                description="PSI of live inputs against training, per selected variable",
+            )
+            meter.create_observable_gauge(
+                "api_data_drift_score",
+                callbacks=[self._observe_score],
+                description="Largest per-variable PSI over the drift window",
+            )
+            meter.create_observable_gauge(
+                "api_drift_window_rows",
+                callbacks=[self._observe_rows],
+                description="Rows counted in the drift window",
+            )
+
+    def reset(self, layout: Optional[BinLayout]) -> None:
+        with self._lock:
+            self.layout = layout
+            self._buckets.clear()
+
+    def observe(self, df: pd.DataFrame) -> None:
+        layout = self.layout
+        if layout is None or not len(df):
+            return
+        try:
+            counts = layout.count(df)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Drift monitor skipped a batch: {e}")
+            return
+
+        now = self.clock()
+        with self._lock:
+            if layout is not self.layout:
+                return
+            if not self._buckets or now - self._buckets[-1][0] >= self.bucket_seconds:
+                self._buckets.append([now, np.zeros(layout.slots, dtype=np.int64), 0])
+            bucket = self._buckets[-1]
+            bucket[1] += counts
+            bucket[2] += len(df)
+
+    def window(self) -> Tuple[Optional[BinLayout], Optional[np.ndarray], int]:
+        """Layout, slot counts and rows of the buckets still inside the window."""
+        horizon = self.clock() - self.bucket_seconds * self._buckets.maxlen
+        with self._lock:
+            live = [b for b in self._buckets if b[0] > horizon]
+            if self.layout is None or not live:
+                return self.layout, None, 0
+            return self.layout, sum(b[1] for b in live), sum(b[2] for b in live)
+
+    def psi(self) -> Dict[str, float]:
+        layout, counts, rows = self.window()
+        if counts is None or rows < self.min_rows:
+            return {}
+        return layout.psi(counts)
+
+    def _observe_psi(self, opts):
+        return [Observation(value, {"feature": name}) for name, value in self.psi().items()]
+
+    def _observe_score(self, opts):
+        values = self.psi().values()
+        return [Observation(max(values))] if values else []
+
+    def _observe_rows(self, opts):
+        return [Observation(self.window()[2])]
@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing as mp
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity / cpuset limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def threads_per_worker(workers: int, cpus: Optional[int] = None) -> int:
+    """Split the available cores evenly so workers x model threads <= cores."""
+    cpus = cpus or available_cpus()
+    return max(1, cpus // max(1, workers))
+
+
+def limit_model_threads(model, n_threads: int) -> None:
+    """Pin the native thread pool of an xgboost / lightgbm sklearn wrapper."""
+    if hasattr(model, "set_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+
+
+class InferenceExecutor:
+    """
+    Dedicated pool that runs CPU-bound inference off the asyncio event loop.
+
+    ``kind`` is ``"thread"`` or ``"process"``. Process workers are forked so
+    they inherit the already loaded model and transformer; submitted callables
+    must be module-level functions.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.model_threads = threads_per_worker(self.workers)
+        self._pool: Optional[Executor] = None
+
+    def _create_pool(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("fork"))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = self._create_pool()
+            logger.info(
+                f"Inference executor: {self.workers} {self.kind} worker(s), "
+                f"{self.model_threads} model thread(s) each"
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Blocking variant of ``run`` for code already off the event loop."""
+        return self.pool.submit(fn, *args).result()
+
+    def restart(self) -> None:
+        """Drop the pool so new workers pick up freshly loaded state."""
+        old, self._pool = self._pool, None
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .drift import BinLayout
+
+
+def _plain(value) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class Explainer:
+    """
+    Per-applicant reasons from tree SHAP contributions.
+
+    Every model feature is the binned value of one raw field, so each
+    contribution is reported against that field together with its raw
+    value and the bin it fell into.
+    """
+
+    def __init__(self, feature_names: List[str], layout: BinLayout):
+        self.feature_names = feature_names
+        self._bins = {f.name: f for f in layout.features}
+
+    @classmethod
+    def for_serving(cls, serving) -> "Explainer":
+        return cls(serving.feature_names, BinLayout.from_transformer(serving.transformer))
+
+    def bin_labels(self, df_raw: pd.DataFrame, name: str) -> List[Optional[str]]:
+        feature = self._bins.get(name)
+        if feature is None or name not in df_raw.columns:
+            return [None] * len(df_raw)
+        labels = np.asarray(feature.labels, dtype=object)
+        return labels[feature.bin_index(df_raw[name].to_numpy())].tolist()
+
+    def explain(self, df_raw: pd.DataFrame, contributions: np.ndarray, top_k: Optional[int] = None) -> List[Dict]:
+        """``contributions`` as returned by ``ServingModel.contributions`` for ``df_raw``."""
+        n_features = len(self.feature_names)
+        if contributions.shape != (len(df_raw), n_features + 1):
+            raise ValueError(f"Expected {n_features + 1} contribution columns, got {contributions.shape}")
+
+        phi = contributions[:, :-1]
+        margin = contributions.sum(axis=1)
+        proba = 1.0 / (1.0 + np.exp(-margin))
+        # Largest absolute contribution first, for every row at once
+        order = np.argsort(-np.abs(phi), axis=1, kind="stable")[:, :top_k]
+
+        values = {
+            name: df_raw[name].tolist() if name in df_raw.columns else [None] * len(df_raw)
+            for name in self.feature_names
+        }
+        labels = {name: self.bin_labels(df_raw, name) for name in self.feature_names}
+
+        return [
+            {
+                "prob_decline": float(proba[i]),
+                "base_value": float(contributions[i, -1]),
+                "contributions": [
+                    {
+                        "feature": self.feature_names[j],
+                        "value": _plain(values[self.feature_names[j]][i]),
+                        "bin": labels[self.feature_names[j]][i],
+                        "contribution": float(phi[i, j]),
+                    }
+                    for j in order[i]
+                ],
+            }
+            for i in range(len(df_raw))
+        ]
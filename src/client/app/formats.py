@@ -0,0 +1,128 @@
+import json
+from io import BytesIO
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+JSON = "application/json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+
+
+class UnsupportedMediaType(ValueError):
+    pass
+
+
+def coerce_column(name: str, values: Any, kind: type) -> np.ndarray:
+    """
+    Validate and convert one column to the dtype ``RawItem`` would produce.
+
+    Checks run once per column on the whole array, never per cell.
+    """
+    arr = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+    if arr.ndim != 1:
+        raise ValueError(f"Column {name} must be one-dimensional")
+
+    if kind is str:
+        arr = arr.astype(object)
+        inferred = pd.api.types.infer_dtype(arr, skipna=True)
+        if inferred not in ("string", "empty"):
+            raise ValueError(f"Column {name} must contain strings, got {inferred}")
+        return np.where(pd.isna(arr), np.nan, arr)
+
+    if arr.dtype.kind in "iub" and kind is int:
+        return arr.astype(np.int64)
+    try:
+        out = arr.astype(np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Column {name} must be numeric")
+    if kind is int and not np.isnan(out).any() and (out == np.round(out)).all():
+        return out.astype(np.int64)
+    return out
+
+
+def to_frame(columns: Mapping[str, Any], schema: Dict[str, type]) -> pd.DataFrame:
+    """Build a DataFrame from column arrays, keeping only columns in ``schema``."""
+    data = {
+        name: coerce_column(name, values, schema[name])
+        for name, values in columns.items()
+        if name in schema
+    }
+    lengths = {len(v) for v in data.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+    if not data or lengths == {0}:
+        raise ValueError("Payload contains no rows for known columns")
+    return pd.DataFrame(data)
+
+
+def decode_records(body: bytes) -> List[dict]:
+    rows = json.loads(body)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Payload must be a JSON array of objects")
+    if not rows:
+        raise ValueError("Payload contains no rows")
+    return rows
+
+
+def records_frame(rows: List[dict], schema: Dict[str, type]) -> pd.DataFrame:
+    """
+    Row objects to a DataFrame of the ``schema`` columns.
+
+    Only those fields are read, once per column; any others in the rows
+    are never looked at.
+    """
+    return to_frame({name: [row.get(name) for row in rows] for name in schema}, schema)
+
+
+def _decode_json(body: bytes) -> Mapping[str, Any]:
+    payload = json.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Columnar JSON must be an object of column -> list of values")
+    return payload
+
+
+def _decode_arrow(body: bytes) -> Mapping[str, Any]:
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all()
+    return {
+        name: table.column(name).to_numpy(zero_copy_only=False)
+        for name in table.column_names
+    }
+
+
+def _decode_msgpack(body: bytes) -> Mapping[str, Any]:
+    import msgpack
+
+    payload = msgpack.unpackb(body, raw=False)
+    if not isinstance(payload, dict):
+        raise ValueError("MessagePack payload must be a map of column -> values")
+    # Columns may be plain arrays or raw .npy buffers
+    return {
+        name: np.load(BytesIO(values), allow_pickle=False) if isinstance(values, bytes) else values
+        for name, values in payload.items()
+    }
+
+
+DECODERS = {
+    JSON: _decode_json,
+    ARROW_STREAM: _decode_arrow,
+    MSGPACK: _decode_msgpack,
+}
+
+
+def read_columns(body: bytes, content_type: Optional[str]) -> Mapping[str, Any]:
+    """The body's column -> values mapping, before any column is coerced."""
+    media_type = (content_type or JSON).split(";")[0].strip().lower()
+    decoder = DECODERS.get(media_type)
+    if decoder is None:
+        raise UnsupportedMediaType(
+            f"Unsupported content type {media_type}; expected one of {sorted(DECODERS)}"
+        )
+    return decoder(body)
+
+
+def decode_columns(body: bytes, content_type: Optional[str], schema: Dict[str, type]) -> pd.DataFrame:
+    return to_frame(read_columns(body, content_type), schema)
@@ -0,0 +1,230 @@
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from threading import Lock
+from time import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .formats import to_frame
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    bucket: str
+    object_name: str
+    output_bucket: str
+    output_object: str
+    state: str = QUEUED
+    rows: int = 0
+    bytes_read: int = 0
+    bytes_total: Optional[int] = None
+    model_name: Optional[str] = None
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def status(self) -> Dict[str, Any]:
+        progress = None
+        if self.state == SUCCEEDED:
+            progress = 1.0
+        elif self.bytes_total:
+            progress = round(min(1.0, self.bytes_read / self.bytes_total), 4)
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "input": f"{self.bucket}/{self.object_name}",
+            "output": f"{self.output_bucket}/{self.output_object}",
+            "rows": self.rows,
+            "progress": progress,
+            "model_name": self.model_name,
+            "model_version": self.model_version,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def prediction_table(proba: np.ndarray, ids: Optional[np.ndarray] = None, id_column: str = "SK_ID_CURR"):
+    """Arrow table with one row per prediction, as written by bulk jobs and the batch scorer."""
+    import pyarrow as pa
+
+    out = {}
+    if ids is not None:
+        out[id_column] = ids
+    out["prob_accept"] = proba[:, 0]
+    out["prob_decline"] = proba[:, 1]
+    out["result"] = np.where(proba.argmax(axis=1) == 0, "Accept", "Decline")
+    return pa.Table.from_pandas(pd.DataFrame(out), preserve_index=False)
+
+
+class _CountingReader:
+    """File-like wrapper over an object-store response that counts bytes read."""
+
+    def __init__(self, raw, job: Job):
+        self.raw = raw
+        self.job = job
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size) if size is not None and size >= 0 else self.raw.read()
+        self.job.bytes_read += len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.read, b"")
+
+
+class JobRunner:
+    """
+    Scores whole CSV or Parquet objects from the object store in the
+    background and writes the results back as Parquet.
+
+    Inputs are read ``chunk_rows`` rows at a time and every chunk is written
+    out before the next one is read, so memory does not grow with the file.
+    A job is scored by the model that was serving when it started, even if
+    a newer version is swapped in meanwhile, and chunks are only checked
+    against the columns that model reads (``raw_schema``). Job state is
+    kept in memory; the last ``max_jobs`` jobs can be polled.
+    """
+
+    def __init__(
+        self,
+        minio_client,
+        model_fn: Callable[[], Any],
+        workers: int = 1,
+        chunk_rows: int = 50_000,
+        max_jobs: int = 1000,
+        id_column: str = "SK_ID_CURR",
+        meter=None,
+    ):
+        self.minio_client = minio_client
+        self.model_fn = model_fn
+        self.chunk_rows = chunk_rows
+        self.max_jobs = max_jobs
+        self.id_column = id_column
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="jobs")
+
+        self._job_count = self._job_rows = None
+        if meter is not None:
+            self._job_count = meter.create_counter("api_jobs", description="Bulk scoring jobs finished, by state")
+            self._job_rows = meter.create_counter("api_job_rows", description="Rows scored by bulk jobs")
+
+    def submit(
+        self, bucket: str, object_name: str, output_bucket: Optional[str] = None, output_object: Optional[str] = None
+    ) -> Job:
+        job_id = uuid.uuid4().hex
+        stem = PurePosixPath(object_name).name.split(".")[0]
+        job = Job(
+            id=job_id,
+            bucket=bucket,
+            object_name=object_name,
+            output_bucket=output_bucket or bucket,
+            output_object=output_object or f"predictions/{stem}-{job_id}.parquet",
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+            self._evict()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _evict(self) -> None:
+        # Oldest finished jobs go first; running ones are kept
+        for job_id in [j for j, job in self._jobs.items() if job.state in (SUCCEEDED, FAILED)]:
+            if len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        job.state, job.started_at = RUNNING, time()
+        tmp = Path(tempfile.mkdtemp(prefix=f"job-{job.id}-"))
+        try:
+            serving = self.model_fn()
+            job.model_name, job.model_version = serving.name, serving.version
+            output = tmp / "predictions.parquet"
+            self._score(job, serving, tmp, output)
+            self.minio_client.fput_object(job.output_bucket, job.output_object, str(output))
+            job.state = SUCCEEDED
+            logger.info(
+                f"Job {job.id} scored {job.rows} rows of {job.bucket}/{job.object_name} "
+                f"with {serving.name}/{serving.version} in {time() - job.started_at:.1f}s"
+            )
+        except Exception as e:
+            job.state, job.error = FAILED, str(e)
+            logger.warning(f"Job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time()
+            shutil.rmtree(tmp, ignore_errors=True)
+            if self._job_count is not None:
+                self._job_count.add(1, {"state": job.state})
+
+    def _score(self, job: Job, serving, tmp: Path, output: Path) -> None:
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in self._chunks(job, tmp):
+                ids = chunk[self.id_column].to_numpy() if self.id_column in chunk.columns else None
+                df = to_frame({name: chunk[name].to_numpy() for name in chunk.columns}, serving.raw_schema)
+                proba = serving.predict_proba(df)
+
+                table = prediction_table(proba, ids, self.id_column)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(output), table.schema)
+                else:
+                    # e.g. ids read as float in a chunk that has a missing one
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+                job.rows += len(df)
+                if self._job_rows is not None:
+                    self._job_rows.add(len(df))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            raise ValueError(f"{job.bucket}/{job.object_name} has no rows")
+
+    def _chunks(self, job: Job, tmp: Path) -> Iterator[pd.DataFrame]:
+        job.bytes_total = self.minio_client.stat_object(job.bucket, job.object_name).size
+        suffix = PurePosixPath(job.object_name).suffix.lower()
+
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            # Parquet needs random access, so it is spooled to disk first
+            local = tmp / "input.parquet"
+            self.minio_client.fget_object(job.bucket, job.object_name, str(local))
+            job.bytes_read = job.bytes_total
+            for batch in pq.ParquetFile(str(local)).iter_batches(batch_size=self.chunk_rows):
+                yield batch.to_pandas()
+            return
+
+        if suffix != ".csv":
+            raise ValueError(f"Unsupported input format {suffix or '(none)'}; expected .csv or .parquet")
+        response = self.minio_client.get_object(job.bucket, job.object_name)
+        try:
+            with pd.read_csv(_CountingReader(response, job), chunksize=self.chunk_rows) as chunks:
+                yield from chunks
+        finally:
+            response.close()
+            response.release_conn()
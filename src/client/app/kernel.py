@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+_UNKNOWN = "__fused_kernel_unknown_category__"
+
+
+@dataclass(frozen=True)
+class NumericFeature:
+    name: str
+    splits: np.ndarray
+    values: np.ndarray
+    missing: float
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        out = self.values[np.searchsorted(self.splits, x, side="right")]
+        out[np.isnan(x)] = self.missing
+        return out
+
+
+@dataclass(frozen=True)
+class CategoricalFeature:
+    name: str
+    categories: pd.Index
+    values: np.ndarray
+    unknown: float
+    missing: float
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        idx = self.categories.get_indexer(x)
+        out = np.where(idx >= 0, self.values[idx], self.unknown)
+        out[pd.isnull(x)] = self.missing
+        return out
+
+
+Feature = Union[NumericFeature, CategoricalFeature]
+
+
+class FusedTransform:
+    """
+    ``binning_process.transform`` followed by ``selector.transform`` as one
+    vectorized pass over only the selected variables.
+
+    Per-bin outputs are read from the fitted BinningProcess itself (by
+    transforming one probe value per bin), so results match it bit for bit.
+    """
+
+    def __init__(self, features: List[Feature]):
+        self.features = features
+        self.columns = [f.name for f in features]
+
+    @classmethod
+    def compile(cls, transformer: dict) -> "FusedTransform":
+        binning = transformer["binning_process"]
+        selector = transformer["selector"]
+
+        binned = np.asarray(binning.get_support(names=True))
+        selected = [str(name) for name in binned[selector.get_support()]]
+
+        probes = {}
+        for name in selected:
+            optb = binning.get_binned_variable(name)
+            if type(optb).__name__ != "OptimalBinning" or optb.special_codes is not None:
+                raise TypeError(f"Cannot compile binning for {name}: {type(optb).__name__}")
+            if optb.dtype == "numerical":
+                splits = np.asarray(optb.splits, dtype=np.float64)
+                # One point per bin (digitize is right-open), then missing
+                probes[name] = [-np.inf, *splits, np.nan]
+            else:
+                categories = [c for b in optb.splits for c in b]
+                probes[name] = [*categories, _UNKNOWN, np.nan]
+
+        # Probe through the binning process so per-variable transform params apply
+        length = max(len(p) for p in probes.values())
+        frame = pd.DataFrame({
+            name: pd.Series(p + [np.nan] * (length - len(p)), dtype=object)
+            if binning.get_binned_variable(name).dtype == "categorical"
+            else np.asarray(p + [np.nan] * (length - len(p)), dtype=np.float64)
+            for name, p in probes.items()
+        })
+        for name in map(str, binned):
+            if name not in frame:
+                frame[name] = np.nan
+        out = binning.transform(frame)
+
+        features: List[Feature] = []
+        for name in selected:
+            n = len(probes[name])
+            values = np.asarray(out[name].to_numpy()[:n], dtype=np.float64)
+            if binning.get_binned_variable(name).dtype == "numerical":
+                features.append(NumericFeature(
+                    name=name,
+                    splits=np.asarray(probes[name][1:-1], dtype=np.float64),
+                    values=values[:-1].copy(),
+                    missing=float(values[-1]),
+                ))
+            else:
+                features.append(CategoricalFeature(
+                    name=name,
+                    categories=pd.Index(probes[name][:-2], dtype=object),
+                    values=values[:-2].copy(),
+                    unknown=float(values[-2]),
+                    missing=float(values[-1]),
+                ))
+
+        logger.info(f"Compiled fused transform for {len(features)} selected variables")
+        return cls(features)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns for transform: {missing}")
+
+        out = np.empty((len(df), len(self.features)), dtype=np.float64)
+        for j, feature in enumerate(self.features):
+            out[:, j] = feature.transform(df[feature.name].to_numpy())
+        return out
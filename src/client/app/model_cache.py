@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+def tree_digest(path: Path) -> str:
+    """sha256 over the relative paths and bytes of every file under ``path``."""
+    h = hashlib.sha256()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        h.update(file.relative_to(path).as_posix().encode())
+        h.update(b"\0")
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _ref_name(name: str) -> str:
+    return name.replace("/", "_")
+
+
+class ModelCache:
+    """
+    Content-addressed on-disk cache of downloaded model artifacts.
+
+    Artifacts live in ``objects/<sha256>/``; ``refs/<model>/<version>`` holds
+    the digest for a registry version and ``refs/<model>/latest`` the last
+    version fetched. Entries are moved into place with renames, so replicas
+    can share one directory.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.refs = self.root / "refs"
+
+    def _ref(self, name: str, version: str) -> Path:
+        return self.refs / _ref_name(name) / str(version)
+
+    def _write_ref(self, ref: Path, value: str) -> None:
+        ref.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ref.with_name(f".{ref.name}.{os.getpid()}.tmp")
+        tmp.write_text(value)
+        os.replace(tmp, ref)
+
+    def get(self, name: str, version: str) -> Optional[Path]:
+        """Local path of a cached version, or None if missing or corrupt."""
+        ref = self._ref(name, version)
+        if not ref.exists():
+            return None
+        digest = ref.read_text().strip()
+        path = self.objects / digest
+        if not path.is_dir() or tree_digest(path) != digest:
+            logger.warning(f"Model cache entry for {name}/{version} is corrupt, ignoring it")
+            return None
+        return path
+
+    def latest(self, name: str) -> Optional[str]:
+        ref = self.refs / _ref_name(name) / "latest"
+        return ref.read_text().strip() if ref.exists() else None
+
+    def fetch(self, name: str, version: str, download_fn: Callable[[str], str]) -> Path:
+        """
+        Return the local path for ``name``/``version``, calling
+        ``download_fn(dst_dir)`` (which returns the downloaded path) on a miss.
+        """
+        path = self.get(name, version)
+        if path is None:
+            self.objects.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=".download-", dir=self.root))
+            try:
+                downloaded = Path(download_fn(str(tmp)))
+                digest = tree_digest(downloaded)
+                path = self.objects / digest
+                if path.exists() and tree_digest(path) != digest:
+                    shutil.rmtree(path, ignore_errors=True)
+                if not path.exists():
+                    try:
+                        os.rename(downloaded, path)
+                    except OSError:
+                        # Another replica stored the same content first
+                        if not path.is_dir():
+                            raise
+                self._write_ref(self._ref(name, version), digest)
+                logger.info(f"Cached {name}/{version} as {digest[:12]}")
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            logger.info(f"Loading {name}/{version} from model cache")
+
+        self._write_ref(self.refs / _ref_name(name) / "latest", str(version))
+        return path
@@ -0,0 +1,163 @@
+"""
+Pre-fork server: load the models once, then fork the uvicorn workers.
+
+    cd src/client
+    python -m app.prefork --workers 4 --port 8000
+
+The parent imports the app, waits until every routed model is loaded and
+warmed up, stops the background threads and forks. Workers inherit the
+boosters, transformer, score tables and memory-mapped packed forests
+copy-on-write, so memory does not grow with every worker and the registry
+is queried once instead of once per worker. Each worker serves Prometheus
+metrics on ``METRICS_PORT + i``. Workers that exit are forked again from
+the parent.
+
+Hot reloads are coordinated by the parent as well: it polls the registry
+every ``MODEL_POLL_SECONDS`` (workers do not), loads and warms up a new
+version itself and then replaces the workers one at a time, so the new
+model is shared the same way and the others keep serving meanwhile.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+from time import monotonic, sleep
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+
+def _serve(app_module, sock: socket.socket, index: int, workers: int, metrics_port: int) -> None:
+    import uvicorn
+
+    os.environ["METRICS_PORT"] = str(metrics_port + index)
+    app_module.after_fork(workers)
+    config = uvicorn.Config(app_module.app, log_level=os.getenv("LOG_LEVEL", "info"))
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, ready_timeout: float = 600.0) -> None:
+    t0 = monotonic()
+    from . import app as app_module
+
+    routed = [app_module.model_watchers[spec.name] for spec in app_module.model_specs]
+    while not all(w.ready for w in routed):
+        if monotonic() - t0 > ready_timeout:
+            raise SystemExit(f"Models not loaded after {ready_timeout:.0f}s")
+        sleep(0.2)
+    app_module.prepare_fork()
+    # Keep the GC from touching (and so copying) every inherited object page
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Models loaded in {monotonic() - t0:.1f}s, forking {workers} workers")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Accepted connections inherit it; without it small responses wait on delayed ACKs
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    metrics_port = int(os.getenv("METRICS_PORT", "8001"))
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _serve(app_module, sock, index, workers, metrics_port)
+            except BaseException as e:
+                logger.error(f"Worker {index} failed: {e}")
+                code = 1
+            os._exit(code)
+        children[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def terminate(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    watchers = list(app_module.model_watchers.values())
+
+    def reload() -> bool:
+        # On the main thread, so no other thread is running when workers are forked
+        swapped = False
+        for watcher in watchers:
+            if not watcher.ready:
+                continue  # e.g. a shadow model still loading; workers load it themselves
+            try:
+                swapped = watcher.poll() or swapped
+            except Exception as e:
+                logger.warning(f"Model reload failed, keeping version {watcher.active.version}: {e}")
+        if swapped:
+            gc.collect()
+            gc.freeze()
+        return swapped
+
+    signal.signal(signal.SIGTERM, terminate)
+    signal.signal(signal.SIGINT, terminate)
+    for i in range(workers):
+        spawn(i)
+
+    poll_interval = min((w.poll_interval for w in watchers if w.poll_interval is not None), default=None)
+    next_poll = monotonic() + poll_interval if poll_interval is not None else None
+    stale: List[int] = []  # workers still serving the replaced version
+    replacing: Optional[int] = None
+
+    while children:
+        if next_poll is not None and monotonic() >= next_poll and not stopping:
+            if reload():
+                logger.info("New model version loaded, replacing workers one at a time")
+                stale = sorted(children.values())
+            next_poll = monotonic() + poll_interval
+        if stale and replacing is None and not stopping:
+            index = stale.pop(0)
+            replacing = next((pid for pid, i in children.items() if i == index), None)
+            if replacing is not None:
+                os.kill(replacing, signal.SIGTERM)
+            continue
+
+        try:
+            # Block only while there is no registry poll to run
+            pid, status = os.waitpid(-1, os.WNOHANG if next_poll is not None and replacing is None else 0)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid == 0:
+            sleep(0.2)
+            continue
+        index = children.pop(pid, None)
+        if pid == replacing:
+            replacing = None
+            if not stopping:
+                spawn(index)
+        elif index is not None and not stopping:
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting it")
+            sleep(1)
+            spawn(index)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFORK_WORKERS", "2")))
+    parser.add_argument("--ready-timeout", type=float, default=float(os.getenv("PREFORK_READY_TIMEOUT", "600")))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.ready_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+from dataclasses import dataclass
+from functools import cached_property
+from threading import Event, Lock, Thread
+from time import perf_counter, time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .kernel import FusedTransform
+from .trees import PackedForest
+
+
+class VersionUnloaded(Exception):
+    """The version a request was routed to has been swapped out twice since."""
+
+
+@dataclass(frozen=True)
+class ServingModel:
+    """A model version together with the transformer it is served with."""
+
+    key: Hashable
+    name: str
+    version: str
+    model_uri: str
+    model: Any
+    transformer: dict
+    feature_kernel: Optional[FusedTransform] = None
+    packed_forest: Optional[PackedForest] = None
+    packed_forest_max_rows: int = 0
+
+    @cached_property
+    def feature_names(self) -> List[str]:
+        """Raw columns behind the model's input features, in model order."""
+        binning = self.transformer["binning_process"]
+        binned = np.asarray(binning.get_support(names=True))
+        return [str(name) for name in binned[self.transformer["selector"].get_support()]]
+
+    @cached_property
+    def raw_columns(self) -> List[str]:
+        """Raw columns ``transform`` reads; the fused kernel only needs the selected ones."""
+        if self.feature_kernel is not None:
+            return self.feature_names
+        return [str(name) for name in self.transformer["binning_process"].variable_names]
+
+    @cached_property
+    def raw_schema(self) -> Dict[str, type]:
+        """``raw_columns`` typed as the binning reads them: numerical as float, categorical as str."""
+        binning = self.transformer["binning_process"]
+        return {
+            name: float if binning.get_binned_variable(name).dtype == "numerical" else str
+            for name in self.raw_columns
+        }
+
+    @cached_property
+    def input_columns(self) -> Tuple[List[str], List[str]]:
+        """Numeric and categorical raw columns that reach the model after selection."""
+        binning = self.transformer["binning_process"]
+        numeric, categorical = [], []
+        for name in self.feature_names:
+            dtype = binning.get_binned_variable(name).dtype
+            (categorical if dtype == "categorical" else numeric).append(name)
+        return numeric, categorical
+
+    def transform(self, df_raw: pd.DataFrame, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Binned, selected features; stage durations (seconds) go into ``timings``."""
+        t0 = perf_counter()
+        if self.feature_kernel is not None:
+            X = self.feature_kernel.transform(df_raw)
+            if timings is not None:
+                timings["transform"] = perf_counter() - t0
+            return X
+
+        binning = self.transformer["binning_process"]
+        selector = self.transformer["selector"]
+
+        df_raw = df_raw[[col for col in df_raw.columns if col in binning.variable_names]]
+
+        # pipeline
+        X_binned = binning.transform(df_raw)
+        t1 = perf_counter()
+        X = selector.transform(X_binned)
+        if timings is not None:
+            timings["binning"] = t1 - t0
+            timings["selection"] = perf_counter() - t1
+        return X
+
+    def predict_proba(self, df_raw: pd.DataFrame, timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+        X = self.transform(df_raw, timings)
+        t0 = perf_counter()
+        if self.packed_forest is not None and len(X) <= self.packed_forest_max_rows:
+            proba = self.packed_forest.predict_proba(X)
+        else:
+            proba = self.model.predict_proba(X)
+        if timings is not None:
+            timings["predict"] = perf_counter() - t0
+        return proba
+
+    def contributions(self, df_raw: pd.DataFrame) -> np.ndarray:
+        """
+        Tree SHAP contributions to the decline log-odds, shape (rows, features + 1);
+        the last column is the bias. Rows sum to the model's margin.
+        """
+        X = self.transform(df_raw)
+        if hasattr(self.model, "get_booster"):
+            import xgboost as xgb
+
+            return self.model.get_booster().predict(xgb.DMatrix(X), pred_contribs=True)
+        if hasattr(self.model, "booster_"):
+            return self.model.predict(X, pred_contrib=True)
+        raise TypeError(f"No tree contributions for {type(self.model).__name__}")
+
+
+class ModelWatcher:
+    """
+    Keeps the active ``ServingModel`` in step with the model registry.
+
+    ``resolve_fn`` returns the key of the version that should be served and
+    is polled every ``poll_interval`` seconds (only once when None). When the key changes,
+    ``load_fn(key)`` builds the candidate in a second slot, which is run on
+    the batches returned by ``warmup_fn`` before it replaces the active one.
+    The swap is a single reference assignment, so requests that already
+    picked up the old model finish on it: the replaced version stays
+    reachable through ``get(key)`` until the next swap.
+
+    Until the first version is active, failed loads are retried every
+    ``retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        resolve_fn: Callable[[], Hashable],
+        load_fn: Callable[[Hashable], ServingModel],
+        warmup_fn: Optional[Callable[[], Sequence[pd.DataFrame]]] = None,
+        poll_interval: Optional[float] = 60.0,
+        retry_interval: float = 5.0,
+    ):
+        self.resolve_fn = resolve_fn
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+
+        self._active: Optional[ServingModel] = None
+        self._previous: Optional[ServingModel] = None
+        self._listeners: List[Callable[[ServingModel, Optional[ServingModel]], None]] = []
+        self._poll_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._active is not None
+
+    @property
+    def active(self) -> ServingModel:
+        if self._active is None:
+            raise RuntimeError("No model loaded yet")
+        return self._active
+
+    def get(self, key: Hashable) -> ServingModel:
+        """
+        The active model if its key is ``key``, else the one it replaced;
+        ``VersionUnloaded`` for anything older.
+        """
+        active, previous = self._active, self._previous
+        if active is not None and active.key == key:
+            return active
+        if previous is not None and previous.key == key:
+            return previous
+        raise VersionUnloaded(f"Model version {key} is no longer loaded")
+
+    def add_listener(self, fn: Callable[[ServingModel, Optional[ServingModel]], None]) -> None:
+        """Call ``fn(model, previous)`` after every activation, on the polling thread."""
+        self._listeners.append(fn)
+
+    def warm_up(self, candidate: ServingModel) -> None:
+        frames = list(self.warmup_fn()) if self.warmup_fn is not None else []
+        t0 = time()
+        for frame in frames:
+            proba = candidate.predict_proba(frame)
+            if proba.shape != (len(frame), 2) or not np.isfinite(proba).all():
+                raise ValueError(f"Warm-up produced invalid output for version {candidate.version}")
+        logger.info(
+            f"Warmed up version {candidate.version} on {len(frames)} batches "
+            f"in {(time() - t0) * 1000:.1f} ms"
+        )
+
+    def poll(self) -> bool:
+        """Load, warm up and activate a new version if there is one. Returns True on swap."""
+        with self._poll_lock:
+            key = self.resolve_fn()
+            if self._active is not None and self._active.key == key:
+                return False
+
+            candidate = self.load_fn(key)
+            self.warm_up(candidate)
+            previous, self._active = self._active, candidate
+            self._previous = previous
+            logger.info(
+                f"Serving version {candidate.version} ({candidate.model_uri})"
+                + (f", replaced {previous.version}" if previous is not None else "")
+            )
+
+        for fn in self._listeners:
+            try:
+                fn(candidate, previous)
+            except Exception as e:
+                logger.warning(f"Model swap listener failed: {e}")
+        return True
+
+    def start(self, initial_delay: float = 0.0) -> "ModelWatcher":
+        """Start the background thread; its first poll waits ``initial_delay`` seconds."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._run, args=(initial_delay,), name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, initial_delay: float = 0.0) -> None:
+        self._stop.wait(initial_delay)
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                if self._active is None:
+                    logger.warning(f"Model load failed, retrying in {self.retry_interval}s: {e}")
+                else:
+                    logger.warning(f"Model reload failed, keeping version {self._active.version}: {e}")
+            self._stop.wait(self.poll_interval if self._active is not None else self.retry_interval)
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def row_keys(df: pd.DataFrame, numeric: List[str], categorical: List[str]) -> List[bytes]:
+    """
+    128-bit digest per row of the given columns.
+
+    Numbers are compared as float64 (so ``1`` and ``1.0`` match, as they do
+    after binning) and every kind of missing value hashes the same.
+    """
+    num = df[numeric].to_numpy(dtype=np.float64) if numeric else np.empty((len(df), 0))
+    num = np.where(np.isnan(num), np.nan, num + 0.0)  # one NaN payload, no -0.0
+    num = np.ascontiguousarray(num)
+
+    cat = df[categorical].to_numpy(dtype=object) if categorical else np.empty((len(df), 0), dtype=object)
+    cat = np.where(pd.isnull(cat), None, cat)
+
+    return [
+        hashlib.blake2b(num[i].tobytes() + repr(tuple(cat[i])).encode(), digest_size=16).digest()
+        for i in range(len(df))
+    ]
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of per-row prediction results.
+
+    Keys combine the serving model's key with a digest of the row, so a new
+    model version never reads old entries (and ``clear`` drops them on swap).
+    At most ``max_entries`` rows are kept, a few hundred bytes each.
+    Concurrent requests for a row that is already being computed wait for
+    that computation instead of starting another one.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: float = 600.0, meter=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = Lock()
+
+        self._hits = self._misses = self._coalesced = self._evictions = None
+        if meter is not None:
+            self._hits = meter.create_counter("api_cache_hits", description="Rows served from the result cache")
+            self._misses = meter.create_counter("api_cache_misses", description="Rows not found in the result cache")
+            self._coalesced = meter.create_counter(
+                "api_cache_coalesced", description="Rows that waited for an identical in-flight computation"
+            )
+            self._evictions = meter.create_counter(
+                "api_cache_evictions", description="Result cache entries dropped, by reason"
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+        self._count(self._evictions, dropped, {"reason": "invalidated"})
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires >= monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        self._count(self._evictions, 1, {"reason": "expired"})
+        return None
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (value, monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._count(self._evictions, evicted, {"reason": "size"})
+
+    async def resolve(
+        self,
+        df: pd.DataFrame,
+        keys: List[Hashable],
+        compute: Callable[[pd.DataFrame], Awaitable[np.ndarray]],
+    ) -> np.ndarray:
+        """Rows of ``df`` from the cache where possible; ``compute`` runs once on the rest."""
+        if not keys:
+            return await compute(df)
+        loop = asyncio.get_running_loop()
+        out: Optional[np.ndarray] = None
+        found: Dict[int, np.ndarray] = {}
+        waits: List[tuple] = []
+        owned: Dict[Hashable, asyncio.Future] = {}
+        todo: List[int] = []
+
+        for i, key in enumerate(keys):
+            value = self.get(key)
+            if value is not None:
+                found[i] = value
+            elif key in self._inflight:
+                waits.append((i, self._inflight[key]))
+            else:
+                future = loop.create_future()
+                self._inflight[key] = owned[key] = future
+                todo.append(i)
+
+        self._count(self._hits, len(found))
+        self._count(self._misses, len(todo))
+        self._count(self._coalesced, len(waits))
+
+        if todo:
+            try:
+                proba = await compute(df.iloc[todo] if len(todo) < len(df) else df)
+            except BaseException as e:
+                for key, future in owned.items():
+                    self._inflight.pop(key, None)
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        future.exception()  # waiters re-raise it; don't log it as unretrieved
+                raise
+            out = np.empty((len(df), proba.shape[1]), dtype=proba.dtype)
+            for j, i in enumerate(todo):
+                key = keys[i]
+                value = proba[j].copy()
+                out[i] = value
+                self.put(key, value)
+                self._inflight.pop(key, None)
+                if not owned[key].done():
+                    owned[key].set_result(value)
+
+        for i, future in waits:
+            try:
+                # shield: a waiter going away must not cancel the shared result
+                found[i] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The request computing it was cancelled; compute this row here
+                found[i] = (await compute(df.iloc[[i]]))[0]
+        if out is None:
+            first = next(iter(found.values()))
+            out = np.empty((len(df), len(first)), dtype=first.dtype)
+        for i, value in found.items():
+            out[i] = value
+        return out
+
+    @staticmethod
+    def _count(counter, n: int, attributes: Optional[dict] = None) -> None:
+        if counter is not None and n:
+            counter.add(n, attributes or {})
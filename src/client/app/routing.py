@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import random
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Awaitable, Callable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+MODEL_TYPES = ("xgb", "lgbm")
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    model_type: str
+    weight: float = 1.0
+
+
+def parse_model_specs(spec: str) -> List[ModelSpec]:
+    """Parse ``name:type[:weight]`` entries separated by commas."""
+    specs = []
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        parts = entry.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Expected name:type[:weight], got '{entry}'")
+        name, model_type = parts[0], parts[1]
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        weight = float(parts[2]) if len(parts) == 3 else 1.0
+        if weight < 0:
+            raise ValueError(f"Negative weight for {name}")
+        specs.append(ModelSpec(name, model_type, weight))
+    if not specs:
+        raise ValueError("No models configured")
+    if len({s.name for s in specs}) != len(specs):
+        raise ValueError("Model names must be unique")
+    return specs
+
+
+def _unit_interval(key) -> float:
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class Router:
+    """
+    Weighted choice between the configured models that are ready.
+
+    With a ``sticky_key`` (an applicant id) the same key always goes to the
+    same model as long as the set of ready models does not change.
+    """
+
+    def __init__(self, specs: List[ModelSpec], rng: Optional[random.Random] = None):
+        self.specs = specs
+        self.rng = rng or random.Random()
+
+    def choose(self, is_ready: Callable[[str], bool], sticky_key=None) -> Optional[str]:
+        candidates = [s for s in self.specs if s.weight > 0 and is_ready(s.name)]
+        if not candidates:
+            return None
+        total = sum(s.weight for s in candidates)
+        u = (_unit_interval(sticky_key) if sticky_key is not None else self.rng.random()) * total
+        for spec in candidates:
+            u -= spec.weight
+            if u < 0:
+                return spec.name
+        return candidates[-1].name
+
+
+class ShadowMirror:
+    """
+    Sends a sampled fraction of requests to a shadow model in the background.
+
+    The response never waits for the shadow; its scores are only compared
+    with the live ones in metrics. At most ``max_pending`` mirrored requests
+    run at once, further samples are dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        predict: Callable[[pd.DataFrame], Awaitable[np.ndarray]],
+        sample_rate: float,
+        max_pending: int = 64,
+        record: Optional[Callable[[str, str, float, np.ndarray], None]] = None,
+        meter=None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.predict = predict
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.record = record
+        self.rng = rng or random.Random()
+        self._pending: Set[asyncio.Task] = set()
+
+        self._dropped = self._abs_diff = self._disagreements = None
+        if meter is not None:
+            self._dropped = meter.create_counter(
+                "api_shadow_dropped", description="Sampled requests not mirrored because the shadow was busy"
+            )
+            self._abs_diff = meter.create_histogram(
+                "api_shadow_abs_diff", description="|shadow - live| decline probability per row"
+            )
+            self._disagreements = meter.create_counter(
+                "api_shadow_disagreements", description="Rows where shadow and live decisions differ"
+            )
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def maybe_mirror(self, df: pd.DataFrame, live_proba: np.ndarray) -> bool:
+        if self.sample_rate <= 0 or self.rng.random() >= self.sample_rate:
+            return False
+        if len(self._pending) >= self.max_pending:
+            if self._dropped is not None:
+                self._dropped.add(1, {"model_name": self.name})
+            return False
+        task = asyncio.get_running_loop().create_task(self._run(df, live_proba))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+
+    async def _run(self, df: pd.DataFrame, live_proba: np.ndarray) -> None:
+        t0 = perf_counter()
+        try:
+            proba = await self.predict(df)
+        except Exception as e:
+            logger.warning(f"Shadow model {self.name} failed: {e}")
+            return
+        if self.record is not None:
+            self.record(self.name, "shadow", (perf_counter() - t0) * 1000, proba)
+        if self._abs_diff is not None:
+            attributes = {"model_name": self.name}
+            step = max(1, len(proba) // 256)
+            for diff in np.abs(proba[::step, 1] - live_proba[::step, 1]):
+                self._abs_diff.record(float(diff), attributes)
+            disagree = int((proba.argmax(axis=1) != live_proba.argmax(axis=1)).sum())
+            if disagree:
+                self._disagreements.add(disagree, attributes)
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+def row_entropy(proba: np.ndarray) -> np.ndarray:
+    return -np.sum(proba * np.log2(proba + 1e-10), axis=1)
+
+
+def row_confidence(proba: np.ndarray) -> np.ndarray:
+    return proba.max(axis=1)
+
+
+@dataclass(frozen=True)
+class ScoreTable:
+    key: Hashable
+    ids: np.ndarray
+    proba: np.ndarray
+    entropy: np.ndarray
+    confidence: np.ndarray
+
+    def position(self, sk_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self.ids, sk_id))
+        if pos >= len(self.ids) or self.ids[pos] != sk_id:
+            return None
+        return pos
+
+
+class ScoreTableBuilder:
+    """
+    Batch-scores a known population once and keeps the results keyed by id.
+
+    ``key`` identifies everything the scores depend on (data snapshot, model
+    and transformer); a table is only served while its key is current.
+    """
+
+    def __init__(self, predict_fn: Callable[[pd.DataFrame], np.ndarray], id_column: str = "SK_ID_CURR"):
+        self.predict_fn = predict_fn
+        self.id_column = id_column
+        self._table: Optional[ScoreTable] = None
+        self._lock = Lock()
+
+    @property
+    def table(self) -> Optional[ScoreTable]:
+        return self._table
+
+    def get(self, key: Hashable) -> Optional[ScoreTable]:
+        table = self._table
+        if table is None or table.key != key:
+            return None
+        return table
+
+    def rebuild(
+        self,
+        frame: pd.DataFrame,
+        key: Hashable,
+        predict_fn: Optional[Callable[[pd.DataFrame], np.ndarray]] = None,
+    ) -> ScoreTable:
+        """Score ``frame`` (sorted by id) in one pass unless already built for ``key``."""
+        with self._lock:
+            if self._table is not None and self._table.key == key:
+                return self._table
+
+            t0 = time()
+            proba = (predict_fn or self.predict_fn)(frame)
+            table = ScoreTable(
+                key=key,
+                ids=frame[self.id_column].to_numpy(),
+                proba=proba,
+                entropy=row_entropy(proba),
+                confidence=row_confidence(proba),
+            )
+            self._table = table
+            logger.info(f"Score table built for {len(frame)} rows in {time() - t0:.2f}s (key={key})")
+            return table
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from io import BytesIO
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    etag: str
+    frame: pd.DataFrame
+    ids: np.ndarray
+
+
+class ApplicantStore:
+    """
+    Local, id-indexed copy of an applicant CSV kept in the object store.
+
+    The object is downloaded once, sorted by ``id_column`` and kept as a
+    columnar DataFrame; lookups are a binary search over the sorted ids.
+    A background thread re-downloads the object only when its ETag changes.
+    """
+
+    def __init__(
+        self,
+        minio_client,
+        bucket: str,
+        object_name: str,
+        id_column: str = "SK_ID_CURR",
+        refresh_interval: float = 60.0,
+    ):
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.object_name = object_name
+        self.id_column = id_column
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[Snapshot] = None
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self._refresh_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        return self._snapshot
+
+    def add_listener(self, fn: Callable[[Snapshot], None]) -> None:
+        """Call ``fn(snapshot)`` after every reload, on the refreshing thread."""
+        self._listeners.append(fn)
+        if self._snapshot is not None:
+            fn(self._snapshot)
+
+    def refresh(self) -> bool:
+        """Reload the snapshot if the object changed. Returns True on reload."""
+        with self._refresh_lock:
+            etag = self.minio_client.stat_object(self.bucket, self.object_name).etag
+            if self._snapshot is not None and self._snapshot.etag == etag:
+                return False
+
+            response = self.minio_client.get_object(self.bucket, self.object_name)
+            try:
+                df = pd.read_csv(BytesIO(response.read()))
+            finally:
+                response.close()
+                response.release_conn()
+
+            snapshot = self.build_snapshot(df, etag, self.id_column)
+            self._snapshot = snapshot
+            logger.info(
+                f"Applicant store loaded {len(df)} rows from "
+                f"{self.bucket}/{self.object_name} (etag={etag})"
+            )
+
+        for fn in self._listeners:
+            try:
+                fn(snapshot)
+            except Exception as e:
+                logger.warning(f"Applicant store listener failed: {e}")
+        return True
+
+    @staticmethod
+    def build_snapshot(df: pd.DataFrame, etag: str, id_column: str = "SK_ID_CURR") -> Snapshot:
+        frame = df.sort_values(id_column, kind="stable").reset_index(drop=True)
+        return Snapshot(etag=etag, frame=frame, ids=frame[id_column].to_numpy())
+
+    def lookup(self, sk_id: int) -> Optional[pd.DataFrame]:
+        """Return the row for ``sk_id`` as a one-row DataFrame, or None."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Applicant store is not loaded yet")
+
+        pos = int(np.searchsorted(snapshot.ids, sk_id))
+        if pos >= len(snapshot.ids) or snapshot.ids[pos] != sk_id:
+            return None
+        return snapshot.frame.iloc[[pos]]
+
+    def start(self, initial_delay: float = 0.0) -> "ApplicantStore":
+        """Start the background thread; its first refresh waits ``initial_delay`` seconds."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = Thread(target=self._run, args=(initial_delay,), name="applicant-store", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, initial_delay: float = 0.0) -> None:
+        self._stop.wait(initial_delay)
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Applicant store refresh failed: {e}")
+            self._stop.wait(self.refresh_interval)
@@ -0,0 +1,68 @@
+from time import perf_counter
+from typing import Dict, Optional
+
+import numpy as np
+
+STAGES = ("parse", "frame", "transform", "binning", "selection", "predict", "serialize")
+
+# Rows recorded per request into per-row histograms; larger payloads are strided
+MAX_ROWS_RECORDED = 256
+
+
+class RequestTimer:
+    """
+    ASGI middleware stamping when a request arrived and counting requests in
+    flight. The stamp (``request.state.received_at``) lets handlers time
+    body parsing and validation, which happen before they are called.
+    """
+
+    def __init__(self, app, telemetry: "Telemetry"):
+        self.app = app
+        self.telemetry = telemetry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        scope.setdefault("state", {})["received_at"] = perf_counter()
+        self.telemetry.in_flight.add(1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.telemetry.in_flight.add(-1)
+
+
+class Telemetry:
+    """
+    Request-path instruments. Attribute dicts are built once so recording
+    a stage is one histogram update.
+    """
+
+    def __init__(self, meter):
+        self.stage_ms = meter.create_histogram(
+            "api_stage_duration", unit="ms", description="Time spent per request-path stage"
+        )
+        self.request_rows = meter.create_histogram(
+            "api_request_rows", unit="rows", description="Rows per prediction request"
+        )
+        self.in_flight = meter.create_up_down_counter(
+            "api_requests_in_flight", description="Requests currently being handled"
+        )
+        self.entropy = meter.create_histogram("api_prediction_entropy", description="Prediction entropy per row")
+        self.confidence = meter.create_histogram(
+            "api_prediction_confidence", description="Model confidence (max class probability) per row"
+        )
+        self._stage_attributes = {stage: {"stage": stage} for stage in STAGES}
+
+    def stage(self, name: str, seconds: float) -> None:
+        self.stage_ms.record(seconds * 1000, self._stage_attributes[name])
+
+    def stages(self, timings: Optional[Dict[str, float]]) -> None:
+        for name, seconds in (timings or {}).items():
+            self.stage(name, seconds)
+
+    def predictions(self, entropies: np.ndarray, confidences: np.ndarray) -> None:
+        self.request_rows.record(len(entropies))
+        step = max(1, len(entropies) // MAX_ROWS_RECORDED)
+        for e, c in zip(entropies[::step].tolist(), confidences[::step].tolist()):
+            self.entropy.record(e)
+            self.confidence.record(c)
@@ -0,0 +1,267 @@
+import ctypes
+import ctypes.util
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_ZERO_THRESHOLD = 1e-35
+
+# numpy's SIMD exp can differ from libm in the last ulp; the native libraries
+# use libm (expf for xgboost, exp for lightgbm), so call it element-wise.
+try:
+    _libm = ctypes.CDLL(ctypes.util.find_library("m"))
+    _libm.expf.restype = ctypes.c_float
+    _libm.expf.argtypes = [ctypes.c_float]
+    _expf = _libm.expf
+except (OSError, AttributeError, TypeError):
+    _expf = math.exp
+
+
+def _exp(x: np.ndarray) -> np.ndarray:
+    fn = _expf if x.dtype == np.float32 else math.exp
+    return np.fromiter(map(fn, x.tolist()), dtype=x.dtype, count=len(x))
+
+
+class _Builder:
+    """Collects nodes of several trees into flat arrays."""
+
+    def __init__(self):
+        self.feature: List[int] = []
+        self.threshold: List[float] = []
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.default_left: List[bool] = []
+        self.missing_type: List[int] = []
+        self.value: List[float] = []
+        self.roots: List[int] = []
+        self.depth = 0
+
+    def add(self, feature=0, threshold=0.0, default_left=False, missing_type=MISSING_NAN, value=0.0) -> int:
+        idx = len(self.feature)
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        # Leaves point at themselves so extra traversal steps are no-ops
+        self.left.append(idx)
+        self.right.append(idx)
+        self.default_left.append(default_left)
+        self.missing_type.append(missing_type)
+        self.value.append(value)
+        return idx
+
+
+class PackedForest:
+    """
+    A binary-classification tree ensemble flattened into NumPy node arrays.
+
+    All trees are walked together, one level per step, for every row of the
+    batch, so predicting a handful of rows costs a few array operations
+    instead of a round trip through the sklearn wrapper and native library.
+    Arithmetic mirrors the source library: float32 with ``x < threshold`` for
+    xgboost, float64 with ``x <= threshold`` for lightgbm.
+    """
+
+    def __init__(self, builder: _Builder, dtype, strict: bool, base_margin: float, n_features: int):
+        self.dtype = np.dtype(dtype)
+        self.strict = strict
+        self.n_features = n_features
+        self.feature = np.asarray(builder.feature, dtype=np.intp)
+        self.threshold = np.asarray(builder.threshold, dtype=self.dtype)
+        self.left = np.asarray(builder.left, dtype=np.intp)
+        self.right = np.asarray(builder.right, dtype=np.intp)
+        self.default_left = np.asarray(builder.default_left, dtype=bool)
+        self.missing_type = np.asarray(builder.missing_type, dtype=np.int8)
+        self.value = np.asarray(builder.value, dtype=self.dtype)
+        self.roots = np.asarray(builder.roots, dtype=np.intp)
+        self.depth = builder.depth
+        self.base_margin = self.dtype.type(base_margin)
+        self._nan_only = bool((self.missing_type == MISSING_NAN).all())
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    # ---------- loaders ---------------------------------------------------
+    @classmethod
+    def from_model(cls, model) -> "PackedForest":
+        if hasattr(model, "get_booster"):
+            return cls.from_xgboost(model)
+        if hasattr(model, "booster_"):
+            return cls.from_lightgbm(model)
+        raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+    @classmethod
+    def from_xgboost(cls, model) -> "PackedForest":
+        if not np.isnan(getattr(model, "missing", np.nan)):
+            raise TypeError("Only missing=NaN xgboost models are supported")
+        learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise TypeError(f"Unsupported objective: {learner['objective']['name']}")
+
+        params = learner["learner_model_param"]
+        base_score = np.float32(params["base_score"].strip("[]"))
+        base_margin = -np.log(np.float32(1.0) / base_score - np.float32(1.0))
+
+        builder = _Builder()
+        for tree in learner["gradient_booster"]["model"]["trees"]:
+            if any(tree["split_type"]):
+                raise TypeError("Categorical xgboost splits are not supported")
+            offset = len(builder.feature)
+            lefts, rights = tree["left_children"], tree["right_children"]
+            for i, left in enumerate(lefts):
+                is_leaf = left == -1
+                builder.add(
+                    feature=0 if is_leaf else tree["split_indices"][i],
+                    threshold=0.0 if is_leaf else tree["split_conditions"][i],
+                    default_left=bool(tree["default_left"][i]),
+                    value=tree["split_conditions"][i] if is_leaf else 0.0,
+                )
+                if not is_leaf:
+                    builder.left[offset + i] = offset + left
+                    builder.right[offset + i] = offset + rights[i]
+            builder.roots.append(offset)
+            builder.depth = max(builder.depth, _depth(lefts, rights))
+
+        return cls(builder, np.float32, strict=True, base_margin=base_margin,
+                   n_features=int(params["num_feature"]))
+
+    @classmethod
+    def from_lightgbm(cls, model) -> "PackedForest":
+        dump = model.booster_.dump_model()
+        if not dump["objective"].startswith("binary") or dump["num_tree_per_iteration"] != 1:
+            raise TypeError(f"Unsupported objective: {dump['objective']}")
+        sigmoid = float(dump["objective"].split("sigmoid:")[-1]) if "sigmoid:" in dump["objective"] else 1.0
+        if sigmoid != 1.0:
+            raise TypeError("Only sigmoid:1 lightgbm models are supported")
+
+        missing_types = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+        builder = _Builder()
+
+        def walk(node, depth) -> int:
+            builder.depth = max(builder.depth, depth)
+            if "leaf_value" in node:
+                return builder.add(value=node["leaf_value"])
+            if node["decision_type"] != "<=":
+                raise TypeError("Categorical lightgbm splits are not supported")
+            idx = builder.add(
+                feature=node["split_feature"],
+                threshold=node["threshold"],
+                default_left=node["default_left"],
+                missing_type=missing_types[node["missing_type"]],
+            )
+            builder.left[idx] = walk(node["left_child"], depth + 1)
+            builder.right[idx] = walk(node["right_child"], depth + 1)
+            return idx
+
+        for tree in dump["tree_info"]:
+            builder.roots.append(walk(tree["tree_structure"], 0))
+
+        return cls(builder, np.float64, strict=False, base_margin=0.0,
+                   n_features=dump["max_feature_idx"] + 1)
+
+    # ---------- memory-mapped storage -------------------------------------
+    _ARRAYS = ("feature", "threshold", "left", "right", "default_left", "missing_type", "value", "roots")
+
+    def save(self, path) -> None:
+        """Write the node arrays as ``.npy`` files under ``path`` (replaced atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".packed-", dir=path.parent))
+        for name in self._ARRAYS:
+            np.save(tmp / f"{name}.npy", getattr(self, name))
+        (tmp / "meta.json").write_text(json.dumps({
+            "dtype": self.dtype.name,
+            "strict": self.strict,
+            "n_features": self.n_features,
+            "depth": self.depth,
+            "base_margin": float(self.base_margin),
+        }))
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another process saved it first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap_mode: Optional[str] = "r") -> "PackedForest":
+        """
+        Load arrays written by ``save``. With ``mmap_mode="r"`` they are
+        read-only views of the files, so every process serving the same
+        model shares one copy in the page cache.
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        forest = cls.__new__(cls)
+        for name in cls._ARRAYS:
+            setattr(forest, name, np.load(path / f"{name}.npy", mmap_mode=mmap_mode))
+        forest.dtype = np.dtype(meta["dtype"])
+        forest.strict = meta["strict"]
+        forest.n_features = meta["n_features"]
+        forest.depth = meta["depth"]
+        forest.base_margin = forest.dtype.type(meta["base_margin"])
+        forest._nan_only = bool((forest.missing_type == MISSING_NAN).all())
+        return forest
+
+    def check(self, model, n_rows: int = 256, seed: int = 0) -> None:
+        """Raise if predictions differ from ``model.predict_proba`` on random input."""
+        rng = np.random.default_rng(seed)
+        X = rng.normal(scale=2.0, size=(n_rows, self.n_features))
+        X[rng.uniform(size=X.shape) < 0.1] = np.nan
+        X[rng.uniform(size=X.shape) < 0.1] = 0.0
+        if not np.array_equal(self.predict_proba(X), model.predict_proba(X)):
+            raise ValueError("Packed forest predictions differ from the model")
+
+    # ---------- evaluation ------------------------------------------------
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)."""
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            x = np.take_along_axis(X, self.feature[nodes], axis=1)
+            thr = self.threshold[nodes]
+            nan = np.isnan(x)
+            if self._nan_only:
+                missing = nan
+            else:
+                mt = self.missing_type[nodes]
+                x = np.where(nan & (mt != MISSING_NAN), 0.0, x)
+                missing = ((mt == MISSING_ZERO) & (np.abs(x) <= _ZERO_THRESHOLD)) | ((mt == MISSING_NAN) & nan)
+            go_left = np.where(missing, self.default_left[nodes], x < thr if self.strict else x <= thr)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def margin(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.leaves(X)
+        # Trees are added one after another, like the native predictors do.
+        # cumsum keeps that order; add.reduce switches to pairwise summation
+        # when a single row makes the reduced axis contiguous.
+        acc = np.empty((self.n_trees + 1, len(leaves)), dtype=self.dtype)
+        acc[0] = self.base_margin
+        acc[1:] = self.value[leaves].T
+        return np.cumsum(acc, axis=0)[-1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        margin = self.margin(X)
+        if self.dtype == np.float32:
+            one = np.float32(1.0)
+            p = one / (_exp(np.minimum(-margin, np.float32(88.7))) + one)
+        else:
+            p = 1.0 / (1.0 + _exp(-margin))
+        return np.column_stack([1 - p, p])
+
+
+def _depth(lefts: List[int], rights: List[int]) -> int:
+    depth, level = 0, [0]
+    while True:
+        level = [c for n in level if lefts[n] != -1 for c in (lefts[n], rights[n])]
+        if not level:
+            return depth
+        depth += 1
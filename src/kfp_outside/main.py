@@ -33,8 +33,8 @@ if __name__ == "__main__":
         "bucket_name":          bucket_name,
         "raw_train_object":     "data/application_train.csv",
         "raw_test_object":      "data/application_test.csv",
-        "dest_train_object":    "data/train/preprocessed_train.csv",
-        "dest_test_object":     "data/test/preprocessed_test.csv",
+        "dest_train_object":    "data/train/preprocessed_train.parquet",
+        "dest_test_object":     "data/test/preprocessed_test.parquet",
         "n_features_to_select": "auto",
         "data_version":         "v1",
         "model_name":           "xgb",
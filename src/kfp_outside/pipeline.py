@@ -20,8 +20,8 @@ def underwriting_pipeline(
     bucket_name:          str,
     raw_train_object:     str,
     raw_test_object:      str,
-    dest_train_object:    str = "processed/train.csv",
-    dest_test_object:     str = "processed/test.csv",
+    dest_train_object:    str = "processed/train.parquet",
+    dest_test_object:     str = "processed/test.parquet",
     n_features_to_select: str = "auto",
     data_version:         str = "v1",
     model_name:           str = "xgb",
@@ -48,8 +48,8 @@ def underwriting_pipeline(
 
     # 3️⃣ Preprocess
     prep = preprocess_op(
-        train_csv=raw_tr.outputs["output"],
-        test_csv= raw_te.outputs["output"],
+        train_data=raw_tr.outputs["output"],
+        test_data= raw_te.outputs["output"],
         minio_endpoint=minio_endpoint,
         minio_access_key=minio_access_key,
         minio_secret_key=minio_secret_key,
@@ -83,8 +83,8 @@ def underwriting_pipeline(
         minio_endpoint=minio_endpoint,
         minio_access_key=minio_access_key,
         minio_secret_key=minio_secret_key,
-        train_csv=proc_tr.outputs["output"],
-        test_csv= proc_te.outputs["output"],
+        train_data=proc_tr.outputs["output"],
+        test_data= proc_te.outputs["output"],
         model_name=model_name,
         version=version,
         experiment_name=experiment_name,
@@ -4,8 +4,8 @@ from kfp.dsl import InputPath, Output, Model, Dataset, OutputPath
 
 @dsl.component(base_image="microwave1005/scipy-img:latest")
 def modeling(
-    train_csv: InputPath(Dataset),
-    test_csv: InputPath(Dataset),
+    train_data: InputPath(Dataset),
+    test_data: InputPath(Dataset),
     model_joblib: Output[Model],
     registered_model: OutputPath(str),
     minio_endpoint: str,
@@ -31,8 +31,8 @@ def modeling(
     os.environ["AWS_ACCESS_KEY_ID"]      = minio_access_key
     os.environ["AWS_SECRET_ACCESS_KEY"]  = minio_secret_key
 
-    # Load processed CSV
-    df = pd.read_csv(train_csv)
+    # Load processed Parquet; dtypes come with it
+    df = pd.read_parquet(train_data)
     X, y = df.drop("TARGET", axis=1), df["TARGET"]
 
     # Optuna tuning
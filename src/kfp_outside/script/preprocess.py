@@ -4,8 +4,8 @@ from kfp.dsl import InputPath, Output, Model, Dataset
 
 @dsl.component(base_image="microwave1005/scipy-img:latest")
 def preprocess(
-    train_csv: InputPath(Dataset),       
-    test_csv:  InputPath(Dataset),   
+    train_data: InputPath(Dataset),
+    test_data:  InputPath(Dataset),
     transformer_joblib: Output[Model],    
     minio_endpoint: str,
     minio_access_key: str,
@@ -15,16 +15,22 @@ def preprocess(
     dest_test_object: str,
     n_features_to_select: str = "auto",
     data_version: str = "v1",
+    n_jobs: int = 0,
+    check_binning: bool = False,
+    chunk_rows: int = 50_000,
 ) -> NamedTuple("Keys", [("train_key", str), ("test_key", str)]):
     import pandas as pd, numpy as np, joblib
-    from pathlib import Path
+    import pyarrow as pa, pyarrow.parquet as pq
+    import multiprocessing as mp, os, sys, types, time
+    from concurrent.futures import ProcessPoolExecutor
+    from pathlib import Path, PurePosixPath
     from minio import Minio
     from optbinning import BinningProcess
     from sklearn.feature_selection import SelectKBest, f_classif
 
-    # Load artifact CSVs
-    df_tr = pd.read_csv(train_csv)
-    df_te = pd.read_csv(test_csv)
+    # Dataloader artifacts are Parquet; the test set is streamed once the
+    # surviving columns are known
+    df_tr = pd.read_parquet(train_data)
 
     # 2) IV‑based filter & binning
     def get_lists(df):
@@ -34,34 +40,94 @@ def preprocess(
             if c in num: num.remove(c)
         return cat, num
 
-    def iv_score(bins, y):
-        tmp = pd.DataFrame({"b": bins, "t": y})
-        tot_g, tot_b = (tmp.t==0).sum(), (tmp.t==1).sum()
-        s = 0
-        for _, g in tmp.groupby("b"):
-            good = (g.t==0).sum() or 0.5
-            bad  = (g.t==1).sum() or 0.5
-            s += (good/tot_g - bad/tot_b)*np.log((good/tot_g)/(bad/tot_b))
-        return s
+    def information_value(bins, target):
+        # Copy of script/woe.py (components are self-contained): bins are
+        # counted with bincount, empty cells count as 0.5 as before
+        codes, labels = pd.factorize(np.asarray(bins), sort=True)
+        target = np.asarray(target)
+        good_rows, bad_rows = (target == 0).astype(float), (target == 1).astype(float)
+        # Missing labels (code -1) land in cell 0, which is dropped
+        good = np.bincount(codes + 1, weights=good_rows, minlength=len(labels) + 1)[1:]
+        bad = np.bincount(codes + 1, weights=bad_rows, minlength=len(labels) + 1)[1:]
+        good, bad = np.where(good == 0, 0.5, good), np.where(bad == 0, 0.5, bad)
+        dg, db = good / good_rows.sum(), bad / bad_rows.sum()
+        return float(np.cumsum((dg - db) * np.log(dg / db))[-1]) if len(labels) else 0.0
 
     cat_cols, num_cols = get_lists(df_tr)
     y = df_tr["TARGET"]
-    X_tr, X_te = df_tr.drop("TARGET", axis=1), df_te.copy()
-
-    survivors = []
-    for f in cat_cols+num_cols:
+    X_tr = df_tr.drop("TARGET", axis=1)
+
+    def cpu_limit():
+        # cgroup v2, then v1 CPU quota; otherwise the cores we may run on
+        try:
+            quota, period = open("/sys/fs/cgroup/cpu.max").read().split()
+            if quota != "max":
+                return max(1, int(int(quota) / int(period)))
+        except (OSError, ValueError):
+            pass
+        try:
+            quota = int(open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read())
+            period = int(open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read())
+            if quota > 0:
+                return max(1, quota // period)
+        except (OSError, ValueError):
+            pass
+        return len(os.sched_getaffinity(0))
+
+    def screen(f):
+        t0 = time.perf_counter()
         bp_tmp = BinningProcess([f], categorical_variables=[f] if f in cat_cols else [])
         bp_tmp.fit(X_tr[[f]].values, y)
         b = bp_tmp.transform(X_tr[[f]].values).flatten()
-        if 0.02 <= iv_score(b,y) <= 0.5 and X_tr[f].isna().mean()<=0.1:
+        # The fitted binning comes back too, so survivors are not binned again
+        optb = bp_tmp.get_binned_variable(f)
+        return information_value(b, y), X_tr[f].isna().mean(), time.perf_counter() - t0, optb
+
+    # Each feature is fitted on its own, so features are screened in
+    # parallel. Tasks name their function by module, so it is registered
+    # in one; forked workers inherit it and the training frame from this
+    # process instead of receiving pickled copies.
+    features = cat_cols + num_cols
+    workers = min(n_jobs if n_jobs > 0 else cpu_limit(), len(features)) or 1
+    t_screen = time.perf_counter()
+    if workers > 1:
+        shared = types.ModuleType("_iv_screening")
+        screen.__module__, screen.__qualname__ = shared.__name__, "screen"
+        shared.screen = screen
+        sys.modules[shared.__name__] = shared
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("fork")) as pool:
+            results = list(pool.map(screen, features, chunksize=1))
+    else:
+        results = [screen(f) for f in features]
+
+    survivors, binnings = [], {}
+    for f, (iv, na_rate, seconds, optb) in zip(features, results):
+        print(f"IV screening {f}: iv={iv:.4f} missing={na_rate:.3f} in {seconds:.2f}s")
+        if 0.02 <= iv <= 0.5 and na_rate<=0.1:
             survivors.append(f)
+            binnings[f] = optb
+    print(f"Screened {len(features)} features with {workers} worker(s) in "
+          f"{time.perf_counter() - t_screen:.1f}s; {len(survivors)} kept")
 
+    # A BinningProcess bins every variable on its own, with the same
+    # settings as the screening fits, so it is assembled from those
+    # instead of fitting the survivors a second time
     bp = BinningProcess(variable_names=survivors,
                         categorical_variables=[c for c in survivors if c in cat_cols])
-    bp.fit(X_tr[survivors].values, y)
+    bp.fit_from_dict(binnings)
+
+    # DataFrames keep per-column dtypes; an object array would make
+    # every variable look categorical
+    df_tr_b = pd.DataFrame(bp.transform(X_tr[survivors]), columns=survivors)
 
-    df_tr_b = pd.DataFrame(bp.transform(X_tr[survivors].values), columns=survivors)
-    df_te_b = pd.DataFrame(bp.transform(X_te[survivors].values), columns=survivors)
+    if check_binning:
+        fresh = BinningProcess(variable_names=survivors,
+                               categorical_variables=[c for c in survivors if c in cat_cols])
+        fresh.fit(X_tr[survivors], y)
+        expected = np.asarray(fresh.transform(X_tr[survivors]), dtype=float)
+        if not np.allclose(df_tr_b.to_numpy(dtype=float), expected, equal_nan=True):
+            raise ValueError("Assembled binning process differs from a fresh fit")
+        print("Assembled binning process matches a fresh fit")
 
     # 3) SelectKBest
     k = len(survivors) if n_features_to_select=="auto" else int(n_features_to_select)
@@ -70,26 +136,39 @@ def preprocess(
 
     keep = df_tr_b.columns[sel.get_support()]
     out_tr = pd.DataFrame(sel.transform(df_tr_b), columns=keep)
-    out_te = pd.DataFrame(sel.transform(df_te_b), columns=keep)
     out_tr["TARGET"] = y
 
     # Dump transformer
     Path(transformer_joblib.path).parent.mkdir(parents=True, exist_ok=True)
     joblib.dump({"binning_process": bp, "selector": sel}, transformer_joblib.path)
 
-    # Push processed CSVs back to MinIO
+    # Push processed Parquet files back to MinIO
     client = Minio(
         minio_endpoint,
         access_key=minio_access_key,
         secret_key=minio_secret_key,
         secure=False,
     )
-    tr_key = dest_train_object.replace(".csv", f"_{data_version}.csv")
-    te_key = dest_test_object.replace(".csv", f"_{data_version}.csv")
+    tr_key = f"{PurePosixPath(dest_train_object).with_suffix('')}_{data_version}.parquet"
+    te_key = f"{PurePosixPath(dest_test_object).with_suffix('')}_{data_version}.parquet"
     tmp_tr = f"/tmp/{Path(tr_key).name}"
     tmp_te = f"/tmp/{Path(te_key).name}"
-    out_tr.to_csv(tmp_tr, index=False)
-    out_te.to_csv(tmp_te, index=False)
+    out_tr.to_parquet(tmp_tr, index=False, compression="zstd")
+
+    # The test set (like any later scoring data) is only transformed, so
+    # it is read chunk_rows at a time and written as it goes: memory
+    # follows the chunk size, not the file size
+    schema = pa.Schema.from_pandas(pd.DataFrame(columns=keep, dtype="float64"), preserve_index=False)
+    te_rows = 0
+    with pq.ParquetWriter(tmp_te, schema, compression="zstd") as writer:
+        for batch in pq.ParquetFile(test_data).iter_batches(batch_size=chunk_rows, columns=survivors):
+            chunk = batch.to_pandas()[survivors]
+            binned = pd.DataFrame(bp.transform(chunk), columns=survivors)
+            out = pd.DataFrame(sel.transform(binned), columns=keep)
+            writer.write_table(pa.Table.from_pandas(out, schema=schema, preserve_index=False))
+            te_rows += len(out)
+    print(f"Processed train {os.path.getsize(tmp_tr) / 1e6:.1f} MB, "
+          f"test {te_rows} rows {os.path.getsize(tmp_te) / 1e6:.1f} MB")
     client.fput_object(bucket_name, tr_key, tmp_tr)
     client.fput_object(bucket_name, te_key, tmp_te)
 
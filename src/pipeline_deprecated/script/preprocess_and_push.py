@@ -40,14 +40,18 @@ def preprocess_and_push(
             if c in num_cols: num_cols.remove(c)
         return cat_cols, num_cols
 
-    def compute_iv(bins, target):
-        df = pd.DataFrame({"b": bins, "t": target})
-        tot_g, tot_b = (df.t == 0).sum(), (df.t == 1).sum()
-        iv = 0
-        for _, g in df.groupby("b"):
-            good, bad = (g.t == 0).sum() or 0.5, (g.t == 1).sum() or 0.5
-            iv += (good/tot_g - bad/tot_b) * np.log((good/tot_g) / (bad/tot_b))
-        return iv
+    def information_value(bins, target):
+        # Copy of script/woe.py (components are self-contained): bins are
+        # counted with bincount, empty cells count as 0.5 as before
+        codes, labels = pd.factorize(np.asarray(bins), sort=True)
+        target = np.asarray(target)
+        good_rows, bad_rows = (target == 0).astype(float), (target == 1).astype(float)
+        # Missing labels (code -1) land in cell 0, which is dropped
+        good = np.bincount(codes + 1, weights=good_rows, minlength=len(labels) + 1)[1:]
+        bad = np.bincount(codes + 1, weights=bad_rows, minlength=len(labels) + 1)[1:]
+        good, bad = np.where(good == 0, 0.5, good), np.where(bad == 0, 0.5, bad)
+        dg, db = good / good_rows.sum(), bad / bad_rows.sum()
+        return float(np.cumsum((dg - db) * np.log(dg / db))[-1]) if len(labels) else 0.0
 
     cat, num = get_feature_lists(df_tr)
     y_tr = df_tr["TARGET"]
@@ -58,7 +62,7 @@ def preprocess_and_push(
         bp1 = BinningProcess([feat], categorical_variables=[feat] if feat in cat else [])
         bp1.fit(X_tr[[feat]].values, y_tr)
         bins = bp1.transform(X_tr[[feat]].values).flatten()
-        if 0.02 <= compute_iv(bins, y_tr) <= 0.5 and X_tr[feat].isna().mean() <= 0.1:
+        if 0.02 <= information_value(bins, y_tr) <= 0.5 and X_tr[feat].isna().mean() <= 0.1:
             survivors.append(feat)
 
     bp = BinningProcess(variable_names=survivors,
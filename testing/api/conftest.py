@@ -0,0 +1,18 @@
+import pytest
+
+from src.client.app.kernel import FusedTransform
+from src.client.app.registry import ServingModel
+from testing.synthetic import fit_model, fit_transformer, make_applications
+
+
+@pytest.fixture(scope="session", params=["xgb", "lgbm"])
+def serving(request):
+    """A ServingModel fitted on synthetic applications, for each model type."""
+    train = make_applications(3000, seed=1)
+    transformer = fit_transformer(train)
+    kernel = FusedTransform.compile(transformer)
+    model = fit_model(kernel.transform(train), train["TARGET"], request.param, n_estimators=20)
+    return ServingModel(
+        key=("m", "1"), name="m", version="1", model_uri="models:/m/1",
+        model=model, transformer=transformer, feature_kernel=kernel,
+    )
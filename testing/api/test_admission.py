@@ -0,0 +1,100 @@
+import asyncio
+from time import perf_counter
+
+import httpx
+from fastapi import FastAPI, Request
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from src.client.app.admission import AdmissionControl
+
+
+def _app(release: asyncio.Event, reader=None, **kwargs):
+    app = FastAPI()
+    meter = MeterProvider(metric_readers=[reader]).get_meter("test") if reader else None
+    app.add_middleware(AdmissionControl, paths=("/work",), meter=meter, **kwargs)
+    seen = []
+    app.state.admitted = []
+
+    @app.post("/work")
+    async def work(request: Request):
+        seen.append(request.state.deadline)
+        app.state.admitted.append(request.state.admitted_at)
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    return app, seen
+
+
+def _depth(reader):
+    for rm in reader.get_metrics_data().resource_metrics:
+        for sm in rm.scope_metrics:
+            for metric in sm.metrics:
+                if metric.name == "api_admission_queue_depth":
+                    return metric.data.data_points[0].value
+
+
+def test_excess_requests_are_queued_then_shed():
+    reader = InMemoryMetricReader()
+
+    async def main():
+        release = asyncio.Event()
+        app, _ = _app(release, reader, max_concurrency=1, max_queue=1, retry_after_seconds=2)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            running = asyncio.ensure_future(client.post("/work"))
+            queued = asyncio.ensure_future(client.post("/work"))
+            await asyncio.sleep(0.05)
+            assert _depth(reader) == 1
+
+            shed = await client.post("/work")
+            assert shed.status_code == 503 and shed.headers["retry-after"] == "2"
+            # Other paths are not limited
+            assert (await client.get("/health")).status_code == 200
+
+            release.set()
+            assert [(await r).status_code for r in (running, queued)] == [200, 200]
+        assert _depth(reader) == 0
+
+    asyncio.run(main())
+
+
+def test_deadline_header_bounds_the_wait_and_reaches_the_handler():
+    async def main():
+        release = asyncio.Event()
+        app, seen = _app(release, max_concurrency=1)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            running = asyncio.ensure_future(client.post("/work", headers={"X-Request-Timeout-Ms": "5000"}))
+            await asyncio.sleep(0.05)
+
+            late = await client.post("/work", headers={"X-Request-Timeout-Ms": "50"})
+            assert late.status_code == 504
+            assert (await client.post("/work", headers={"X-Request-Timeout-Ms": "soon"})).status_code == 400
+
+            release.set()
+            assert (await running).status_code == 200
+            assert (await client.post("/work")).status_code == 200
+        assert seen[0] is not None and seen[1] is None
+
+    asyncio.run(main())
+
+
+def test_admission_time_is_stamped_after_the_queue_wait():
+    async def main():
+        release = asyncio.Event()
+        app, _ = _app(release, max_concurrency=1)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            running = asyncio.ensure_future(client.post("/work"))
+            await asyncio.sleep(0.05)
+            queued = asyncio.ensure_future(client.post("/work"))
+            await asyncio.sleep(0.1)
+            released_at = perf_counter()
+            release.set()
+            assert [(await r).status_code for r in (running, queued)] == [200, 200]
+        # Stages timed from admission leave the queue wait out
+        assert app.state.admitted[0] < released_at <= app.state.admitted[1]
+
+    asyncio.run(main())
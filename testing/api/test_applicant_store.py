@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.client.app.store import ApplicantStore
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self):
+        return self._data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, df: pd.DataFrame, etag: str = "v1"):
+        self.set(df, etag)
+        self.downloads = 0
+
+    def set(self, df, etag):
+        self._data = df.to_csv(index=False).encode()
+        self._etag = etag
+
+    def stat_object(self, bucket, object_name):
+        return SimpleNamespace(etag=self._etag)
+
+    def get_object(self, bucket, object_name):
+        self.downloads += 1
+        return FakeResponse(self._data)
+
+
+def _frame(ids):
+    return pd.DataFrame({"SK_ID_CURR": ids, "AMT_CREDIT": [float(i) * 10 for i in ids]})
+
+
+def test_lookup_before_refresh_raises():
+    store = ApplicantStore(FakeMinio(_frame([1])), "b", "o")
+    with pytest.raises(RuntimeError):
+        store.lookup(1)
+
+
+def test_lookup_finds_rows_in_unsorted_file():
+    store = ApplicantStore(FakeMinio(_frame([300, 100, 200])), "b", "o")
+    store.refresh()
+
+    row = store.lookup(200)
+    assert list(row["SK_ID_CURR"]) == [200]
+    assert list(row["AMT_CREDIT"]) == [2000.0]
+    assert store.lookup(150) is None
+    assert store.lookup(999) is None
+
+
+def test_refresh_only_downloads_when_etag_changes():
+    client = FakeMinio(_frame([1, 2]))
+    store = ApplicantStore(client, "b", "o")
+
+    assert store.refresh() is True
+    assert store.refresh() is False
+    assert client.downloads == 1
+
+    client.set(_frame([1, 2, 3]), "v2")
+    assert store.refresh() is True
+    assert client.downloads == 2
+    assert store.lookup(3) is not None
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.batch_score import score_file
+from testing.synthetic import make_applications
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_scores_match_the_serving_model_in_input_order(serving, tmp_path, workers):
+    df = make_applications(2500, seed=4, target=False)
+    df.to_csv(tmp_path / "in.csv", index=False)
+
+    rows = score_file(serving, tmp_path / "in.csv", tmp_path / "out.parquet", workers=workers, chunk_rows=400)
+
+    out = pd.read_parquet(tmp_path / "out.parquet")
+    assert rows == len(out) == len(df)
+    np.testing.assert_array_equal(out["SK_ID_CURR"], df["SK_ID_CURR"])
+    np.testing.assert_allclose(out["prob_decline"], serving.predict_proba(df)[:, 1], rtol=1e-6)
+
+
+def test_parquet_input(serving, tmp_path):
+    df = make_applications(700, seed=5, target=False)
+    df.to_parquet(tmp_path / "in.parquet", index=False)
+
+    assert score_file(serving, tmp_path / "in.parquet", tmp_path / "out.parquet", chunk_rows=256) == 700
+    assert list(pd.read_parquet(tmp_path / "out.parquet").columns) == [
+        "SK_ID_CURR", "prob_accept", "prob_decline", "result"
+    ]
@@ -0,0 +1,192 @@
+import asyncio
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.admission import DeadlineExceeded
+from src.client.app.batching import MicroBatcher
+
+
+def _predict(df: pd.DataFrame) -> np.ndarray:
+    p = df["x"].to_numpy() / 100
+    return np.column_stack([1 - p, p])
+
+
+def test_concurrent_requests_are_coalesced_and_scattered():
+    calls = []
+
+    def predict(df):
+        calls.append(len(df))
+        return _predict(df)
+
+    batcher = MicroBatcher(predict, max_batch_size=100, max_wait_ms=50)
+    frames = [pd.DataFrame({"x": [i, i + 1]}) for i in range(0, 10, 2)]
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(df) for df in frames))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert calls == [10]
+    for df, proba in zip(frames, results):
+        np.testing.assert_array_equal(proba, _predict(df))
+
+
+def test_batch_size_limit_splits_batches():
+    calls = []
+
+    def predict(df):
+        calls.append(len(df))
+        return _predict(df)
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=50)
+
+    async def main():
+        await asyncio.gather(*(batcher.submit(pd.DataFrame({"x": [1, 2]})) for _ in range(4)))
+        await batcher.stop()
+
+    asyncio.run(main())
+    assert calls == [4, 4]
+
+
+def test_errors_propagate_to_every_caller_that_fails():
+    def predict(df):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(predict, max_wait_ms=20)
+
+    async def main():
+        results = await asyncio.gather(
+            batcher.submit(pd.DataFrame({"x": [1]})),
+            batcher.submit(pd.DataFrame({"x": [2]})),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_executor_runs_batches_off_the_event_loop():
+    import threading
+
+    from src.client.app.executor import InferenceExecutor, threads_per_worker
+
+    seen = []
+
+    def predict(df):
+        seen.append(threading.current_thread().name)
+        return _predict(df)
+
+    executor = InferenceExecutor(kind="thread", workers=2)
+    batcher = MicroBatcher(predict, max_wait_ms=5, executor=executor, max_concurrency=2)
+
+    async def main():
+        proba = await batcher.submit(pd.DataFrame({"x": [3]}))
+        await batcher.stop()
+        return proba
+
+    np.testing.assert_array_equal(asyncio.run(main()), _predict(pd.DataFrame({"x": [3]})))
+    executor.shutdown()
+    assert seen and seen[0].startswith("inference")
+    assert threads_per_worker(4, cpus=8) == 2
+    assert threads_per_worker(16, cpus=8) == 1
+
+
+def test_stats_returned_with_the_batch_are_reported_once():
+    stats = []
+
+    def predict(df):
+        return _predict(df), {"predict": 0.001}
+
+    batcher = MicroBatcher(predict, max_batch_size=100, max_wait_ms=20, on_stats=stats.append)
+    frames = [pd.DataFrame({"x": [i]}) for i in range(3)]
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(df) for df in frames))
+        await batcher.stop()
+        return results
+
+    for df, proba in zip(frames, asyncio.run(main())):
+        np.testing.assert_array_equal(proba, _predict(df))
+    assert stats == [{"predict": 0.001}]
+
+
+def test_requests_past_their_deadline_are_not_predicted():
+    calls = []
+
+    def predict(df):
+        calls.append(len(df))
+        return _predict(df)
+
+    batcher = MicroBatcher(predict, max_wait_ms=20)
+
+    async def main():
+        now = perf_counter()
+        results = await asyncio.gather(
+            batcher.submit(pd.DataFrame({"x": [1, 2]}), deadline=now - 1),
+            batcher.submit(pd.DataFrame({"x": [3]}), deadline=now + 60),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    expired, live = asyncio.run(main())
+    assert isinstance(expired, DeadlineExceeded)
+    np.testing.assert_array_equal(live, _predict(pd.DataFrame({"x": [3]})))
+    assert calls == [1]
+
+
+def test_requests_with_different_keys_are_not_coalesced():
+    calls = []
+
+    def predict(df, key):
+        calls.append((key, len(df)))
+        return _predict(df)
+
+    batcher = MicroBatcher(predict, max_batch_size=100, max_wait_ms=20)
+
+    async def main():
+        results = await asyncio.gather(
+            batcher.submit(pd.DataFrame({"x": [1, 2]}), key="v1"),
+            batcher.submit(pd.DataFrame({"x": [3]}), key="v2"),
+            batcher.submit(pd.DataFrame({"x": [4]}), key="v1"),
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert sorted(calls) == [("v1", 3), ("v2", 1)]
+    np.testing.assert_array_equal(results[2], _predict(pd.DataFrame({"x": [4]})))
+
+
+def test_a_bad_request_only_fails_its_own_caller():
+    calls = []
+
+    def predict(df):
+        calls.append(len(df))
+        return _predict(df.astype({"x": float}))
+
+    batcher = MicroBatcher(predict, max_batch_size=100, max_wait_ms=20)
+
+    async def main():
+        results = await asyncio.gather(
+            batcher.submit(pd.DataFrame({"x": [1, 2]})),
+            batcher.submit(pd.DataFrame({"x": ["not a number"]})),
+            batcher.submit(pd.DataFrame({"x": [3]})),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    good, bad, other = asyncio.run(main())
+    assert isinstance(bad, ValueError)
+    np.testing.assert_array_equal(good, _predict(pd.DataFrame({"x": [1, 2]})))
+    np.testing.assert_array_equal(other, _predict(pd.DataFrame({"x": [3]})))
+    # One coalesced call, then each request on its own
+    assert calls == [4, 2, 1, 1]
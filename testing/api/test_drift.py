@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.client.app.drift import BinLayout, DriftMonitor
+from testing.synthetic import fit_transformer, make_applications
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    train = make_applications(4000, seed=1)
+    return train, fit_transformer(train)
+
+
+def test_training_rows_reproduce_reference_counts(fitted):
+    train, transformer = fitted
+    layout = BinLayout.from_transformer(transformer)
+    assert layout.features
+
+    np.testing.assert_array_equal(layout.count(train), layout.reference)
+    assert max(layout.psi(layout.count(train)).values()) == pytest.approx(0.0, abs=1e-12)
+
+
+def test_shifted_inputs_raise_psi(fitted):
+    _, transformer = fitted
+    layout = BinLayout.from_transformer(transformer)
+    live = make_applications(2000, seed=5, target=False)
+
+    baseline = layout.psi(layout.count(live))
+    assert max(baseline.values()) < 0.1
+
+    name = next(f.name for f in layout.features if f.splits is not None)
+    live[name] = live[name].max() * 10
+    assert layout.psi(layout.count(live))[name] > 1.0
+
+
+def test_window_expires_buckets_and_reset_forgets(fitted):
+    _, transformer = fitted
+    now = [0.0]
+    monitor = DriftMonitor(window_seconds=60, buckets=6, min_rows=100, clock=lambda: now[0])
+    monitor.reset(BinLayout.from_transformer(transformer))
+    live = make_applications(50, seed=6, target=False)
+
+    monitor.observe(live)
+    assert monitor.psi() == {}  # below min_rows
+    now[0] = 30.0
+    monitor.observe(live)
+    assert monitor.window()[2] == 100 and monitor.psi()
+
+    now[0] = 65.0  # first bucket left the window
+    assert monitor.window()[2] == 50
+
+    monitor.reset(BinLayout.from_transformer(transformer))
+    assert monitor.window()[2] == 0
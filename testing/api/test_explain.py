@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.client.app.drift import BinLayout
+from src.client.app.explain import Explainer
+from testing.synthetic import fit_transformer, make_applications
+
+
+def test_contributions_add_up_to_the_prediction(serving):
+    df = make_applications(200, seed=4, target=False)
+    contributions = serving.contributions(df)
+    assert contributions.shape == (len(df), len(serving.feature_names) + 1)
+
+    explanations = Explainer.for_serving(serving).explain(df, contributions)
+    np.testing.assert_allclose(
+        [e["prob_decline"] for e in explanations], serving.predict_proba(df)[:, 1], rtol=1e-4, atol=1e-6
+    )
+
+
+def test_reasons_are_sorted_and_carry_raw_value_and_bin(serving):
+    df = make_applications(20, seed=5, target=False)
+    explainer = Explainer.for_serving(serving)
+    explanations = explainer.explain(df, serving.contributions(df), top_k=3)
+
+    for i, e in enumerate(explanations):
+        assert len(e["contributions"]) == 3
+        weights = [abs(c["contribution"]) for c in e["contributions"]]
+        assert weights == sorted(weights, reverse=True)
+        for c in e["contributions"]:
+            assert c["feature"] in serving.feature_names
+            assert c["bin"] == explainer.bin_labels(df.iloc[[i]], c["feature"])[0]
+            raw = df[c["feature"]].iloc[i]
+            assert c["value"] == (None if raw != raw else raw)
+
+
+def test_bin_labels_read_like_the_binning_table():
+    # Keep every field so a categorical one is binned too
+    transformer = fit_transformer(make_applications(3000, seed=1), k=100)
+    explainer = Explainer([], BinLayout.from_transformer(transformer))
+    df = make_applications(2, seed=5, target=False)
+    df["CODE_GENDER"] = ["F", "M"]
+    df["AMT_INCOME_TOTAL"] = [0.0, 1e9]
+
+    assert explainer.bin_labels(df, "CODE_GENDER") == ["[F]", "[M]"]
+    splits = transformer["binning_process"].get_binned_variable("AMT_INCOME_TOTAL").splits
+    assert explainer.bin_labels(df, "AMT_INCOME_TOTAL") == [
+        f"(-inf, {splits[0]:.2f})",
+        f"[{splits[-1]:.2f}, inf)",
+    ]
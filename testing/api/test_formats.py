@@ -0,0 +1,64 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.formats import UnsupportedMediaType, decode_columns, decode_records, records_frame
+
+SCHEMA = {"SK_ID_CURR": int, "CODE_GENDER": str, "AMT_CREDIT": float, "CNT_CHILDREN": int}
+
+
+def test_column_json_matches_row_frame():
+    body = json.dumps({
+        "SK_ID_CURR": [1, 2, 3],
+        "CODE_GENDER": ["F", None, "M"],
+        "AMT_CREDIT": [1.5, None, 3],
+        "CNT_CHILDREN": [0, None, 2],
+        "UNKNOWN": ["skipped", "skipped", "skipped"],
+    }).encode()
+
+    df = decode_columns(body, "application/json", SCHEMA)
+
+    rows = [
+        {"SK_ID_CURR": 1, "CODE_GENDER": "F", "AMT_CREDIT": 1.5, "CNT_CHILDREN": 0},
+        {"SK_ID_CURR": 2, "CODE_GENDER": None, "AMT_CREDIT": None, "CNT_CHILDREN": None},
+        {"SK_ID_CURR": 3, "CODE_GENDER": "M", "AMT_CREDIT": 3.0, "CNT_CHILDREN": 2},
+    ]
+    expected = pd.DataFrame(rows).replace({None: np.nan})
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert df["SK_ID_CURR"].dtype == np.int64
+    assert "UNKNOWN" not in df
+
+
+def test_schema_errors_are_per_column():
+    with pytest.raises(ValueError, match="AMT_CREDIT"):
+        decode_columns(json.dumps({"AMT_CREDIT": ["a"]}).encode(), "application/json", SCHEMA)
+    with pytest.raises(ValueError, match="CODE_GENDER"):
+        decode_columns(json.dumps({"CODE_GENDER": [1]}).encode(), "application/json", SCHEMA)
+    with pytest.raises(ValueError, match="same length"):
+        decode_columns(
+            json.dumps({"AMT_CREDIT": [1], "CNT_CHILDREN": [1, 2]}).encode(), "application/json", SCHEMA
+        )
+
+
+def test_unknown_content_type():
+    with pytest.raises(UnsupportedMediaType):
+        decode_columns(b"", "text/csv", SCHEMA)
+
+
+def test_records_keep_only_schema_columns():
+    body = json.dumps([
+        {"SK_ID_CURR": 1, "CODE_GENDER": "F", "AMT_CREDIT": 2, "UNKNOWN": {"nested": [1]}},
+        {"SK_ID_CURR": 2, "CNT_CHILDREN": 1},
+    ]).encode()
+
+    df = records_frame(decode_records(body), SCHEMA)
+
+    assert list(df.columns) == list(SCHEMA)
+    assert df["AMT_CREDIT"].dtype == np.float64 and np.isnan(df["AMT_CREDIT"].iloc[1])
+    assert df["CODE_GENDER"].tolist()[0] == "F" and pd.isna(df["CODE_GENDER"].iloc[1])
+    with pytest.raises(ValueError, match="AMT_CREDIT"):
+        records_frame(decode_records(b'[{"AMT_CREDIT": "a lot"}]'), SCHEMA)
+    with pytest.raises(ValueError, match="array of objects"):
+        decode_records(b'{"data": []}')
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.kernel import FusedTransform
+from testing.synthetic import fit_transformer, make_applications
+
+
+@pytest.fixture(scope="module")
+def transformer():
+    return fit_transformer(make_applications(4000, seed=1))
+
+
+def _reference(transformer, df):
+    binning = transformer["binning_process"]
+    df = df[[col for col in df.columns if col in binning.variable_names]]
+    return transformer["selector"].transform(binning.transform(df))
+
+
+def test_fused_kernel_is_bit_identical(transformer):
+    kernel = FusedTransform.compile(transformer)
+    df = make_applications(3000, seed=2, target=False)
+    # Values outside the training range and unseen categories
+    df.loc[:9, "AMT_CREDIT"] = 1e12
+    df.loc[10:19, "EXT_SOURCE_3"] = -5.0
+    df.loc[20:29, "OCCUPATION_TYPE"] = "Astronaut"
+    df.loc[30:39, "CODE_GENDER"] = np.nan
+
+    expected = _reference(transformer, df)
+    actual = kernel.transform(df)
+
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_fused_kernel_only_keeps_selected_columns(transformer):
+    kernel = FusedTransform.compile(transformer)
+    binned = list(transformer["binning_process"].get_support(names=True))
+    selected = [n for n, keep in zip(binned, transformer["selector"].get_support()) if keep]
+    assert kernel.columns == selected
+
+    df = make_applications(5, seed=3, target=False)
+    with pytest.raises(ValueError):
+        kernel.transform(df.drop(columns=selected[0]))
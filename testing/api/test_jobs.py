@@ -0,0 +1,130 @@
+import io
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.jobs import FAILED, SUCCEEDED, JobRunner
+from testing.synthetic import make_applications
+
+SCHEMA = {"SK_ID_CURR": int, "AMT_CREDIT": float, "CODE_GENDER": str}
+
+
+class FakeResponse(io.BytesIO):
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self):
+        self.objects = {}
+
+    def stat_object(self, bucket, object_name):
+        return SimpleNamespace(size=len(self.objects[(bucket, object_name)]))
+
+    def get_object(self, bucket, object_name):
+        return FakeResponse(self.objects[(bucket, object_name)])
+
+    def fget_object(self, bucket, object_name, file_path):
+        with open(file_path, "wb") as f:
+            f.write(self.objects[(bucket, object_name)])
+
+    def fput_object(self, bucket, object_name, file_path):
+        with open(file_path, "rb") as f:
+            self.objects[(bucket, object_name)] = f.read()
+
+
+class FakeModel:
+    name, version = "m", "3"
+    raw_schema = {"AMT_CREDIT": float, "CODE_GENDER": str}
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, df):
+        self.batches.append(len(df))
+        p = (df["AMT_CREDIT"].to_numpy() / 1e7).clip(0, 1)
+        return np.column_stack([1 - p, p])
+
+
+def _wait(runner, job):
+    for _ in range(200):
+        if runner.get(job.id).state in (SUCCEEDED, FAILED):
+            return runner.get(job.id)
+        time.sleep(0.02)
+    raise TimeoutError(job.status())
+
+
+@pytest.fixture
+def frame():
+    return make_applications(1000, seed=3, target=False)[list(SCHEMA)]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_job_scores_in_chunks_and_writes_parquet(frame, fmt):
+    minio, model = FakeMinio(), FakeModel()
+    buf = io.BytesIO()
+    frame.to_csv(buf, index=False) if fmt == "csv" else frame.to_parquet(buf, index=False)
+    minio.objects[("data", f"in/apps.{fmt}")] = buf.getvalue()
+    runner = JobRunner(minio, lambda: model, chunk_rows=300)
+
+    job = _wait(runner, runner.submit("data", f"in/apps.{fmt}"))
+
+    assert job.state == SUCCEEDED, job.error
+    assert model.batches == [300, 300, 300, 100]
+    status = job.status()
+    assert status["rows"] == 1000 and status["progress"] == 1.0 and status["model_version"] == "3"
+    out = pd.read_parquet(io.BytesIO(minio.objects[("data", job.output_object)]))
+    np.testing.assert_array_equal(out["SK_ID_CURR"], frame["SK_ID_CURR"])
+    np.testing.assert_allclose(out["prob_decline"], (frame["AMT_CREDIT"] / 1e7).clip(0, 1))
+    assert set(out["result"]) <= {"Accept", "Decline"}
+
+
+def test_job_failures_are_reported(frame):
+    minio = FakeMinio()
+    minio.objects[("data", "in/apps.xlsx")] = b"x"
+    runner = JobRunner(minio, FakeModel)
+
+    job = _wait(runner, runner.submit("data", "in/apps.xlsx"))
+    assert job.state == FAILED and "Unsupported input format" in job.error
+    assert runner.get("unknown") is None
+
+
+def test_job_accepts_home_credit_column_types():
+    # As in application_test.csv: HOUSETYPE_MODE and EMERGENCYSTATE_MODE hold
+    # strings and TOTALAREA_MODE floats, unlike their RawItem annotations
+    from optbinning import BinningProcess
+    from sklearn.feature_selection import SelectKBest, f_classif
+
+    from src.client.app.registry import ServingModel
+
+    rng = np.random.default_rng(7)
+    df = make_applications(1000, seed=7)
+    df["HOUSETYPE_MODE"] = rng.choice(["block of flats", "specific housing", "terraced house", None], len(df))
+    df["EMERGENCYSTATE_MODE"] = rng.choice(["No", "Yes", None], len(df))
+    df["TOTALAREA_MODE"] = np.where(rng.uniform(size=len(df)) < 0.3, np.nan, rng.uniform(0, 1, len(df)))
+    names = ["HOUSETYPE_MODE", "EMERGENCYSTATE_MODE", "TOTALAREA_MODE", "EXT_SOURCE_2"]
+    bp = BinningProcess(names, categorical_variables=names[:2]).fit(df[names], df["TARGET"])
+    sel = SelectKBest(f_classif, k="all").fit(np.nan_to_num(bp.transform(df[names])), df["TARGET"])
+
+    class Model:
+        def predict_proba(self, X):
+            p = 1 / (1 + np.exp(-X.sum(axis=1)))
+            return np.column_stack([1 - p, p])
+
+    serving = ServingModel(
+        key=("m", "1"), name="m", version="1", model_uri="models:/m/1", model=Model(),
+        transformer={"binning_process": bp, "selector": sel},
+    )
+    assert serving.raw_schema == {
+        "HOUSETYPE_MODE": str, "EMERGENCYSTATE_MODE": str, "TOTALAREA_MODE": float, "EXT_SOURCE_2": float,
+    }
+    minio = FakeMinio()
+    minio.objects[("data", "in/application_test.csv")] = df.drop(columns="TARGET").to_csv(index=False).encode()
+    runner = JobRunner(minio, lambda: serving, chunk_rows=400)
+
+    job = _wait(runner, runner.submit("data", "in/application_test.csv"))
+    assert job.state == SUCCEEDED, job.error
+    assert job.rows == 1000
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from src.client.app.model_cache import ModelCache
+
+
+def _downloader(calls, payload=b"booster"):
+    def download(dst):
+        calls.append(dst)
+        model_dir = Path(dst) / "model"
+        model_dir.mkdir()
+        (model_dir / "MLmodel").write_text("flavors: {}")
+        (model_dir / "model.bin").write_bytes(payload)
+        return str(model_dir)
+    return download
+
+
+def test_fetch_downloads_once_and_dedupes_content(tmp_path):
+    cache = ModelCache(tmp_path)
+    calls = []
+
+    path = cache.fetch("credit-model", "3", _downloader(calls))
+    assert (path / "model.bin").read_bytes() == b"booster"
+    assert cache.fetch("credit-model", "3", _downloader(calls)) == path
+    assert len(calls) == 1
+
+    # Same bytes under another version share one object
+    assert cache.fetch("credit-model", "4", _downloader(calls)) == path
+    assert cache.latest("credit-model") == "4"
+    assert len(list((tmp_path / "objects").iterdir())) == 1
+    assert not list(tmp_path.glob(".download-*"))
+
+
+def test_corrupt_entry_is_downloaded_again(tmp_path):
+    cache = ModelCache(tmp_path)
+    calls = []
+    path = cache.fetch("credit-model", "1", _downloader(calls))
+    (path / "model.bin").write_bytes(b"truncated")
+
+    assert cache.get("credit-model", "1") is None
+    fresh = cache.fetch("credit-model", "1", _downloader(calls))
+    assert (fresh / "model.bin").read_bytes() == b"booster"
+    assert len(calls) == 2
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.registry import ModelWatcher, ServingModel, VersionUnloaded
+
+
+class ConstantModel:
+    def __init__(self, p):
+        self.p = p
+
+    def predict_proba(self, X):
+        return np.tile([1 - self.p, self.p], (len(X), 1))
+
+
+def _serving(version, p):
+    identity = SimpleNamespace(transform=lambda df: df.to_numpy(dtype=float))
+    return ServingModel(
+        key=(version,), name="m", version=version, model_uri=f"models:/m/{version}",
+        model=ConstantModel(p), transformer={}, feature_kernel=identity,
+    )
+
+
+def test_watcher_swaps_after_warm_up():
+    registry = {"version": "1"}
+    loaded, swapped = [], []
+
+    def load(key):
+        loaded.append(key)
+        return _serving(key[0], 0.1 if key[0] == "1" else 0.9)
+
+    frames = [pd.DataFrame({"x": [1.0] * n}) for n in (1, 4)]
+    watcher = ModelWatcher(lambda: (registry["version"],), load, warmup_fn=lambda: frames)
+    watcher.add_listener(lambda model, previous: swapped.append((model.version, previous)))
+
+    assert not watcher.ready
+    assert watcher.poll()
+    old = watcher.active
+    assert watcher.ready
+    assert not watcher.poll()
+    assert loaded == [("1",)] and swapped == [("1", None)]
+
+    registry["version"] = "2"
+    assert watcher.poll()
+    assert watcher.active.version == "2"
+    assert swapped[1] == ("2", old)
+    # A request holding the old model still finishes on it
+    assert old.predict_proba(frames[0])[0, 1] == 0.1
+    assert watcher.active.predict_proba(frames[0])[0, 1] == 0.9
+
+
+def test_failed_warm_up_keeps_active_model():
+    registry = {"version": "1"}
+
+    def load(key):
+        p = 0.1 if key[0] == "1" else np.nan
+        return _serving(key[0], p)
+
+    watcher = ModelWatcher(
+        lambda: (registry["version"],), load, warmup_fn=lambda: [pd.DataFrame({"x": [1.0]})]
+    )
+    watcher.poll()
+    registry["version"] = "2"
+    with pytest.raises(ValueError):
+        watcher.poll()
+    assert watcher.active.version == "1"
+
+
+def test_request_queued_across_a_swap_is_scored_by_its_version():
+    import asyncio
+
+    from src.client.app.batching import MicroBatcher
+
+    registry = {"version": "1"}
+    watcher = ModelWatcher(
+        lambda: (registry["version"],), lambda key: _serving(key[0], 0.1 if key[0] == "1" else 0.9)
+    )
+    watcher.poll()
+    # Wired like the app: the batcher is given the key captured on arrival
+    batcher = MicroBatcher(
+        lambda df, key: watcher.get(key).predict_proba(df), max_batch_size=100, max_wait_ms=50
+    )
+    frame = pd.DataFrame({"x": [1.0]})
+
+    async def main():
+        old = watcher.active
+        queued = asyncio.ensure_future(batcher.submit(frame, key=old.key))
+        await asyncio.sleep(0)
+        registry["version"] = "2"
+        watcher.poll()
+        new = watcher.active
+        results = await asyncio.gather(queued, batcher.submit(frame, key=new.key))
+        await batcher.stop()
+        return results
+
+    old_proba, new_proba = asyncio.run(main())
+    assert old_proba[0, 1] == 0.1 and new_proba[0, 1] == 0.9
+    # Two swaps later the first version is gone
+    registry["version"] = "3"
+    watcher.poll()
+    assert watcher.get(("2",)).version == "2"
+    with pytest.raises(VersionUnloaded):
+        watcher.get(("1",))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from src.client.app.trees import PackedForest
+from testing.synthetic import fit_model, fit_transformer, make_applications
+
+
+@pytest.fixture(scope="module")
+def data():
+    df = make_applications(4000, seed=1)
+    transformer = fit_transformer(df)
+    features = transformer["binning_process"].variable_names
+    X = transformer["selector"].transform(transformer["binning_process"].transform(df[features]))
+    return X, df["TARGET"].to_numpy()
+
+
+@pytest.mark.parametrize("model_type", ["xgb", "lgbm"])
+def test_packed_forest_is_bit_identical(data, model_type):
+    X, y = data
+    model = fit_model(X, y, model_type=model_type)
+    forest = PackedForest.from_model(model)
+    forest.check(model)
+
+    X = X.copy()
+    X[:20, 0] = np.nan
+    X[20:40, 1] = 0.0
+    expected = model.predict_proba(X)
+    np.testing.assert_array_equal(forest.predict_proba(X), expected)
+    # Single rows take the serving path and must not change the summation order
+    for i in range(0, 200, 7):
+        np.testing.assert_array_equal(forest.predict_proba(X[i:i + 1]), expected[i:i + 1])
+
+
+def test_packed_forest_rejects_wrong_width(data):
+    X, y = data
+    forest = PackedForest.from_model(fit_model(X, y, n_estimators=5))
+    with pytest.raises(ValueError):
+        forest.predict_proba(X[:, :-1])
+
+
+@pytest.mark.parametrize("model_type", ["xgb", "lgbm"])
+def test_saved_forest_loads_memory_mapped(data, model_type, tmp_path):
+    X, y = data
+    model = fit_model(X, y, model_type=model_type)
+    PackedForest.from_model(model).save(tmp_path / "forest")
+
+    forest = PackedForest.load(tmp_path / "forest")
+    assert isinstance(forest.value, np.memmap) and not forest.value.flags.writeable
+    np.testing.assert_array_equal(forest.predict_proba(X[:50]), model.predict_proba(X[:50]))
+    np.testing.assert_array_equal(forest.predict_proba(X[:1]), model.predict_proba(X[:1]))
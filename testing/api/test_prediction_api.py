@@ -42,11 +42,56 @@ EXPECTED_RESPONSE = {
 }
 
 def test_prediction_success(client, monkeypatch):
-    monkeypatch.setattr("src.client.app.app.infer", lambda x: EXPECTED_RESPONSE)
+    async def fake_infer(items, deadline=None, serving=None):
+        return EXPECTED_RESPONSE
+    monkeypatch.setattr("src.client.app.app.infer", fake_infer)
     res = client.post("/Prediction", json=_payload())
     assert res.status_code == 200
     assert _strip(res.json()) == EXPECTED_RESPONSE
 
+def test_request_for_an_unloaded_version_is_retried(client, monkeypatch):
+    from src.client.app.registry import VersionUnloaded
+
+    async def fake_infer(items, deadline=None, serving=None):
+        raise VersionUnloaded("Model version ('m', '1') is no longer loaded")
+    monkeypatch.setattr("src.client.app.app.infer", fake_infer)
+    res = client.post("/Prediction", json=_payload())
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+
+def test_request_is_scored_by_the_model_it_was_parsed_for(client, monkeypatch):
+    from importlib import import_module
+    from types import SimpleNamespace
+    import numpy as np
+
+    mod = import_module(IMPORT_PATH)
+    parsed_for = SimpleNamespace(
+        key=("m", "1"), name=mod.primary_name, version="1", raw_schema={"AMT_CREDIT": float}
+    )
+    swapped_in = SimpleNamespace(
+        key=("m", "2"), name=mod.primary_name, version="2", raw_schema={"CODE_GENDER": str}
+    )
+    watcher = SimpleNamespace(ready=True, active=parsed_for)
+    monkeypatch.setitem(mod.model_watchers, mod.primary_name, watcher)
+
+    parse_records = mod.parse_records
+    def parse_then_swap(body):
+        parsed = parse_records(body)
+        watcher.active = swapped_in
+        return parsed
+    monkeypatch.setattr(mod, "parse_records", parse_then_swap)
+
+    scored = []
+    async def fake_predict(df_raw, serving, deadline=None):
+        scored.append((serving, list(df_raw.columns)))
+        return np.array([[0.9, 0.1]])
+    monkeypatch.setattr(mod, "cached_predict", fake_predict)
+
+    res = client.post("/Prediction", json=_payload())
+    assert res.status_code == 200
+    assert res.json()["model_version"] == "1"
+    assert scored == [(parsed_for, ["SK_ID_CURR", "AMT_CREDIT"])]
+
 def test_prediction_missing_column(client):
     payload = _payload()
     for row in payload["data"]:
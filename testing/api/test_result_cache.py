@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from src.client.app.result_cache import ResultCache, row_keys
+
+
+def _predict(df: pd.DataFrame) -> np.ndarray:
+    p = df["x"].to_numpy(dtype=float) / 100
+    return np.column_stack([1 - p, p])
+
+
+def _keys(df, version="1"):
+    return [(version, k) for k in row_keys(df, ["x"], ["c"])]
+
+
+def test_row_keys_are_canonical():
+    a = pd.DataFrame({"x": [1, 2], "c": pd.Series(["F", None], dtype=object)})
+    b = pd.DataFrame({"x": [1.0, 2.0], "c": pd.Series(["F", np.nan], dtype=object)})
+    c = pd.DataFrame({"x": [1.0, 2.0], "c": pd.Series(["M", None], dtype=object)})
+    assert row_keys(a, ["x"], ["c"]) == row_keys(b, ["x"], ["c"])
+    assert row_keys(a, ["x"], ["c"])[0] != row_keys(c, ["x"], ["c"])[0]
+    assert row_keys(a, ["x"], ["c"])[1] == row_keys(c, ["x"], ["c"])[1]
+
+
+def test_hits_skip_compute_and_versions_do_not_mix():
+    cache = ResultCache()
+    calls = []
+
+    async def compute(df):
+        calls.append(len(df))
+        return _predict(df)
+
+    df = pd.DataFrame({"x": [10, 20, 30], "c": ["F", "M", "F"]})
+
+    async def main():
+        first = await cache.resolve(df, _keys(df), compute)
+        partial = pd.DataFrame({"x": [20, 40], "c": ["M", "M"]})
+        second = await cache.resolve(partial, _keys(partial), compute)
+        other = await cache.resolve(df, _keys(df, version="2"), compute)
+        return first, second, other
+
+    first, second, other = asyncio.run(main())
+    assert calls == [3, 1, 3]
+    np.testing.assert_array_equal(first, _predict(df))
+    np.testing.assert_array_equal(second, _predict(pd.DataFrame({"x": [20, 40]})))
+    np.testing.assert_array_equal(other, first)
+
+
+def test_identical_inflight_rows_are_computed_once():
+    cache = ResultCache()
+    calls = []
+
+    async def compute(df):
+        calls.append(len(df))
+        await asyncio.sleep(0.01)
+        return _predict(df)
+
+    df = pd.DataFrame({"x": [5, 5], "c": ["F", "F"]})
+
+    async def main():
+        return await asyncio.gather(*(cache.resolve(df, _keys(df), compute) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    for proba in results:
+        np.testing.assert_array_equal(proba, _predict(df))
+
+
+def test_failures_reach_waiters_and_are_not_cached():
+    cache = ResultCache()
+
+    async def fail(df):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model down")
+
+    df = pd.DataFrame({"x": [1], "c": ["F"]})
+
+    async def main():
+        return await asyncio.gather(
+            cache.resolve(df, _keys(df), fail), cache.resolve(df, _keys(df), fail), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(cache) == 0
+
+
+def test_lru_bound_and_ttl():
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    for key in ("a", "b"):
+        cache.put(key, np.array([0.5, 0.5]))
+    cache.get("a")
+    cache.put("c", np.array([0.5, 0.5]))
+    assert cache.get("b") is None and cache.get("a") is not None
+
+    expired = ResultCache(ttl_seconds=-1)
+    expired.put("a", np.array([0.5, 0.5]))
+    assert expired.get("a") is None and len(expired) == 0
@@ -0,0 +1,62 @@
+import asyncio
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.client.app.routing import ModelSpec, Router, ShadowMirror, parse_model_specs
+
+
+def test_parse_model_specs():
+    specs = parse_model_specs("credit-xgb:xgb:90, credit-lgbm:lgbm:10")
+    assert specs == [ModelSpec("credit-xgb", "xgb", 90.0), ModelSpec("credit-lgbm", "lgbm", 10.0)]
+    assert parse_model_specs("m:lgbm") == [ModelSpec("m", "lgbm", 1.0)]
+    for bad in ("m", "m:catboost", "m:xgb:1,m:lgbm:1", ""):
+        with pytest.raises(ValueError):
+            parse_model_specs(bad)
+
+
+def test_router_follows_weights_and_readiness():
+    router = Router(parse_model_specs("a:xgb:80,b:lgbm:20"), rng=random.Random(0))
+    counts = Counter(router.choose(lambda n: True) for _ in range(5000))
+    assert 0.77 < counts["a"] / 5000 < 0.83
+
+    assert router.choose(lambda n: n == "b") == "b"
+    assert router.choose(lambda n: False) is None
+
+
+def test_sticky_key_always_maps_to_the_same_model():
+    router = Router(parse_model_specs("a:xgb:50,b:lgbm:50"))
+    for key in range(100):
+        assert len({router.choose(lambda n: True, key) for _ in range(5)}) == 1
+    assert {router.choose(lambda n: True, key) for key in range(100)} == {"a", "b"}
+
+
+def test_shadow_runs_off_the_request_and_is_bounded():
+    recorded = []
+    release = asyncio.Event()
+
+    async def predict(df):
+        await release.wait()
+        return np.column_stack([np.full(len(df), 0.3), np.full(len(df), 0.7)])
+
+    shadow = ShadowMirror(
+        "s", predict, sample_rate=1.0, max_pending=2,
+        record=lambda name, role, ms, proba: recorded.append((name, role, proba[0, 1])),
+    )
+    df = pd.DataFrame({"x": [1.0]})
+    live = np.array([[0.9, 0.1]])
+
+    async def main():
+        started = [shadow.maybe_mirror(df, live) for _ in range(3)]
+        assert shadow.pending == 2 and not recorded
+        release.set()
+        while shadow.pending:
+            await asyncio.sleep(0)
+        return started
+
+    assert asyncio.run(main()) == [True, True, False]
+    assert recorded == [("s", "shadow", 0.7)] * 2
+    assert not ShadowMirror("s", predict, sample_rate=0.0).maybe_mirror(df, live)
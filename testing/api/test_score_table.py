@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from src.client.app.score_table import ScoreTableBuilder, row_confidence, row_entropy
+
+
+def _predict(df: pd.DataFrame) -> np.ndarray:
+    p = (df["SK_ID_CURR"].to_numpy() % 10) / 10
+    return np.column_stack([1 - p, p])
+
+
+def test_table_matches_row_scoring_and_follows_key():
+    calls = []
+
+    def predict(df):
+        calls.append(len(df))
+        return _predict(df)
+
+    frame = pd.DataFrame({"SK_ID_CURR": [11, 12, 15]})
+    builder = ScoreTableBuilder(predict)
+
+    table = builder.rebuild(frame, key=("etag", 1))
+    assert builder.rebuild(frame, key=("etag", 1)) is table
+    assert calls == [3]
+
+    pos = table.position(12)
+    expected = _predict(frame.iloc[[1]])
+    np.testing.assert_array_equal(table.proba[pos], expected[0])
+    assert table.entropy[pos] == row_entropy(expected)[0]
+    assert table.confidence[pos] == row_confidence(expected)[0]
+    assert table.position(13) is None
+
+    assert builder.get(("etag", 2)) is None
+    builder.rebuild(frame, key=("etag", 2))
+    assert calls == [3, 3]
@@ -0,0 +1,51 @@
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from src.client.app.telemetry import RequestTimer, Telemetry
+
+
+def _points(reader):
+    points = {}
+    for rm in reader.get_metrics_data().resource_metrics:
+        for sm in rm.scope_metrics:
+            for metric in sm.metrics:
+                for dp in metric.data.data_points:
+                    points[(metric.name, dp.attributes.get("stage"))] = dp
+    return points
+
+
+def test_stages_and_rows_are_recorded():
+    reader = InMemoryMetricReader()
+    telemetry = Telemetry(MeterProvider(metric_readers=[reader]).get_meter("test"))
+
+    telemetry.stages({"transform": 0.002, "predict": 0.003})
+    telemetry.stage("serialize", 0.001)
+    telemetry.predictions(np.full(1000, 0.5), np.full(1000, 0.9))
+
+    points = _points(reader)
+    assert points[("api_stage_duration", "predict")].sum == 3.0
+    assert points[("api_stage_duration", "serialize")].count == 1
+    assert points[("api_request_rows", None)].sum == 1000
+    # Per-row histograms are strided for large payloads
+    assert points[("api_prediction_entropy", None)].count <= 256 * 2
+
+
+def test_request_timer_stamps_and_tracks_in_flight():
+    reader = InMemoryMetricReader()
+    telemetry = Telemetry(MeterProvider(metric_readers=[reader]).get_meter("test"))
+    app = FastAPI()
+    app.add_middleware(RequestTimer, telemetry=telemetry)
+    seen = {}
+
+    @app.get("/")
+    def root(request: Request):
+        seen["received_at"] = request.state.received_at
+        seen["in_flight"] = _points(reader)[("api_requests_in_flight", None)].value
+        return {}
+
+    assert TestClient(app).get("/").status_code == 200
+    assert seen["received_at"] > 0 and seen["in_flight"] == 1
+    assert _points(reader)[("api_requests_in_flight", None)].value == 0
@@ -0,0 +1,280 @@
+"""
+Throughput and latency of the prediction API on a local stack.
+
+Starts ``local_stack`` in a subprocess, then drives ``/Prediction`` and
+``/Prediction-by-id`` for every concurrency x batch size combination and
+reports req/s, rows/s, latency percentiles and peak RSS, plus the server's
+startup time and the memory of every serving process (``--prefork N``
+serves with N pre-forked workers). Memory is reported next to the
+sequential latency of ``/`` and ``/ready``, so a serving mode that saves
+memory but stalls small responses shows up as such.
+
+    python -m testing.benchmark.bench_api --concurrency 1 8 32 --batch-sizes 1 16 256 \\
+        --output bench_api.json --baseline previous.json
+
+Server settings are passed through the environment, e.g.
+``BATCH_ENABLED=false INFERENCE_EXECUTOR=process``. The result cache is off
+unless ``RESULT_CACHE_ENABLED`` is set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from testing.benchmark.local_stack import prepare
+from testing.synthetic import make_applications
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """Current RSS, peak RSS and proportional set size of ``pid`` (Linux only).
+
+    PSS splits pages shared between processes evenly, so summing it over
+    pre-forked workers gives their real combined footprint.
+    """
+    out: Dict[str, Optional[float]] = {"rss_mb": None, "peak_rss_mb": None, "pss_mb": None}
+    fields = {"VmRSS:": "rss_mb", "VmHWM:": "peak_rss_mb", "Pss:": "pss_mb"}
+    for name in ("status", "smaps_rollup"):
+        try:
+            for line in Path(f"/proc/{pid}/{name}").read_text().splitlines():
+                key = line.split(":")[0] + ":"
+                if key in fields:
+                    out[fields[key]] = int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    return out
+
+
+def serving_pids(server_pid: int, prefork: bool) -> List[int]:
+    """The pre-forked workers of ``server_pid``, or the server itself."""
+    if not prefork:
+        return [server_pid]
+    children = []
+    for task in Path(f"/proc/{server_pid}/task").glob("*"):
+        try:
+            children += [int(p) for p in (task / "children").read_text().split()]
+        except OSError:
+            pass
+    return children
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(workdir: Path, port: int, model_type: str, n_estimators: int, prefork: int = 0) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "testing.benchmark.local_stack",
+        "--workdir", str(workdir), "--port", str(port),
+        "--model-type", model_type, "--n-estimators", str(n_estimators),
+        "--prefork", str(prefork),
+    ]
+    # Payloads repeat, so the result cache would turn the run into a cache benchmark
+    env = {"RESULT_CACHE_ENABLED": "false", **os.environ}
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    deadline = perf_counter() + 300
+    while perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        sleep(0.5)
+    server.terminate()
+    raise TimeoutError("Server did not become ready")
+
+
+async def drive(
+    url: str, payloads: List, concurrency: int, duration: float, by_id: bool
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    stop_at = perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient, offset: int) -> None:
+        nonlocal errors
+        i = offset
+        while perf_counter() < stop_at:
+            payload = payloads[i % len(payloads)]
+            t0 = perf_counter()
+            if by_id:
+                response = await client.post(url, params={"id": payload})
+            else:
+                response = await client.post(url, json=payload)
+            if response.status_code == 200:
+                latencies.append(perf_counter() - t0)
+            else:
+                errors += 1
+            i += concurrency
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        t0 = perf_counter()
+        await asyncio.gather(*(worker(client, k) for k in range(concurrency)))
+        elapsed = perf_counter() - t0
+
+    ms = np.asarray(latencies) * 1000 if latencies else np.full(1, np.nan)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def probe_latency(base_url: str, paths=("/", "/ready"), n: int = 50) -> Dict[str, Dict[str, float]]:
+    """p50/p99 ms of ``n`` sequential GETs per path on one keep-alive connection."""
+    out = {}
+    with httpx.Client(timeout=10) as client:
+        for path in paths:
+            client.get(base_url + path)
+            ms = []
+            for _ in range(n):
+                t0 = perf_counter()
+                client.get(base_url + path)
+                ms.append((perf_counter() - t0) * 1000)
+            out[path] = {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+    return out
+
+
+def payloads_for(batch_size: int, n: int = 64) -> List[List[dict]]:
+    # Requests cycle through these; the server runs with the result cache off
+    df = make_applications(batch_size * n, seed=7, target=False).drop(columns="SK_ID_CURR")
+    rows = json.loads(df.to_json(orient="records"))
+    return [rows[i * batch_size:(i + 1) * batch_size] for i in range(n)]
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    baseline = {
+        (r["endpoint"], r["concurrency"], r["batch_size"]): r
+        for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        old = baseline.get((r["endpoint"], r["concurrency"], r["batch_size"]))
+        if old is None:
+            continue
+        print(
+            f"{r['endpoint']:>20} c={r['concurrency']:<4} b={r['batch_size']:<5} "
+            f"req/s {100 * (r['req_per_s'] / old['req_per_s'] - 1):+6.1f}%  "
+            f"p99 {100 * (r['p99_ms'] / old['p99_ms'] - 1):+6.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--endpoints", nargs="+", choices=["Prediction", "Prediction-by-id"],
+                        default=["Prediction", "Prediction-by-id"])
+    parser.add_argument("--model-type", choices=["xgb", "lgbm"], default="xgb")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--prefork", type=int, default=0, help="Serve with this many pre-forked workers")
+    parser.add_argument("--workdir", help="Reuse fitted artifacts from this directory")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="bench-api-"))
+    prepare(workdir, args.model_type, args.n_estimators)
+    t0 = perf_counter()
+    server = start_server(workdir, args.port, args.model_type, args.n_estimators, args.prefork)
+    startup_s = perf_counter() - t0
+    print(f"Server ready in {startup_s:.1f}s")
+
+    probe = probe_latency(f"http://127.0.0.1:{args.port}")
+    results = []
+    print(f"{'endpoint':>20} {'conc':>5} {'rows':>5} {'req/s':>9} {'rows/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>7}")
+    try:
+        ids = list(range(100001, 100001 + 5000))
+        for endpoint in args.endpoints:
+            by_id = endpoint == "Prediction-by-id"
+            url = f"http://127.0.0.1:{args.port}/{endpoint}"
+            for batch_size in [1] if by_id else args.batch_sizes:
+                payloads = ids if by_id else payloads_for(batch_size)
+                for concurrency in args.concurrency:
+                    stats = asyncio.run(drive(url, payloads, concurrency, args.duration, by_id))
+                    row = {
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "batch_size": batch_size,
+                        **stats,
+                        "rows_per_s": stats["req_per_s"] * batch_size,
+                        "peak_rss_mb": max(
+                            (memory_mb(pid)["peak_rss_mb"] or 0.0)
+                            for pid in serving_pids(server.pid, args.prefork > 0)
+                        ),
+                    }
+                    results.append(row)
+                    print(f"{endpoint:>20} {concurrency:>5} {batch_size:>5} {row['req_per_s']:>9.1f} "
+                          f"{row['rows_per_s']:>10.1f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+                          f"{row['p99_ms']:>8.2f} {row['peak_rss_mb']:>7.1f}")
+        workers = [{"pid": pid, **memory_mb(pid)} for pid in serving_pids(server.pid, args.prefork > 0)]
+        parent = {"pid": server.pid, **memory_mb(server.pid)} if args.prefork else None
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print(f"\n{len(workers)} serving process(es):")
+    for w in workers:
+        print(f"  pid {w['pid']}: rss {w['rss_mb'] or 0:.1f} MB, peak {w['peak_rss_mb'] or 0:.1f} MB, "
+              f"pss {w['pss_mb'] or 0:.1f} MB")
+    total_pss = sum(w["pss_mb"] or 0 for w in workers + ([parent] if parent else []))
+    if parent:
+        print(f"  parent pid {parent['pid']}: pss {parent['pss_mb'] or 0:.1f} MB")
+    print(f"  total pss {total_pss:.1f} MB")
+    for path, stats in probe.items():
+        print(f"  GET {path}: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
+    for r in results:
+        if r["concurrency"] == min(args.concurrency):
+            print(f"  {r['endpoint']} b={r['batch_size']} c={r['concurrency']}: "
+                  f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms")
+
+    if args.output:
+        meta = {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "model_type": args.model_type,
+            "n_estimators": args.n_estimators,
+            "duration_s": args.duration,
+            "prefork": args.prefork,
+            "startup_s": startup_s,
+            "workers": workers,
+            "prefork_parent": parent,
+            "total_pss_mb": total_pss,
+            "probe_latency": probe,
+            # Server knobs that change the numbers
+            "env": {k: v for k, v in os.environ.items() if k.split("_")[0] in (
+                "BATCH", "INFERENCE", "RESULT", "PACKED", "FUSED", "SCORE", "DRIFT", "PREFORK"
+            )},
+        }
+        Path(args.output).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
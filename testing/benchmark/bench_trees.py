@@ -0,0 +1,60 @@
+"""
+Per-batch-size latency of PackedForest vs model.predict_proba.
+
+    python -m testing.benchmark.bench_trees --model-type xgb --batch-sizes 1 8 64 512
+"""
+import argparse
+import json
+from time import perf_counter
+
+import numpy as np
+
+from src.client.app.kernel import FusedTransform
+from src.client.app.trees import PackedForest
+from testing.synthetic import fit_model, fit_transformer, make_applications
+
+
+def timings(fn, X, repeats: int) -> np.ndarray:
+    fn(X)  # warm-up
+    out = np.empty(repeats)
+    for i in range(repeats):
+        t0 = perf_counter()
+        fn(X)
+        out[i] = (perf_counter() - t0) * 1000
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-type", choices=["xgb", "lgbm"], default="xgb")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256, 1024])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    df = make_applications(20000, seed=0)
+    transformer = fit_transformer(df)
+    X_all = FusedTransform.compile(transformer).transform(df)
+    model = fit_model(X_all, df["TARGET"], args.model_type, args.n_estimators)
+    forest = PackedForest.from_model(model)
+    assert np.array_equal(forest.predict_proba(X_all), model.predict_proba(X_all))
+
+    results = []
+    print(f"{'rows':>6} {'engine':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for n in args.batch_sizes:
+        X = X_all[:n]
+        for engine, fn in (("sklearn", model.predict_proba), ("packed", forest.predict_proba)):
+            t = timings(fn, X, args.repeats)
+            row = {"rows": n, "engine": engine, "p50_ms": float(np.percentile(t, 50)),
+                   "p99_ms": float(np.percentile(t, 99))}
+            results.append(row)
+            print(f"{n:>6} {engine:>8} {row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"model_type": args.model_type, "n_trees": forest.n_trees, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
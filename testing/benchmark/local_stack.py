@@ -0,0 +1,137 @@
+"""
+Runs the prediction API without MinIO or a remote MLflow.
+
+``prepare`` fits a transformer and model on synthetic data, registers the
+model in a file-backed MLflow registry and writes the applicant test set
+to a directory that stands in for the bucket. ``serve`` starts the app
+with ``minio.Minio`` replaced by ``LocalObjectStore``, either as one
+uvicorn process or pre-forked (``--prefork N``).
+
+    python -m testing.benchmark.local_stack --workdir /tmp/bench --port 8000
+"""
+import argparse
+import hashlib
+import io
+import os
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict
+
+import joblib
+
+from testing.synthetic import fit_model, fit_transformer, make_applications
+
+MODEL_NAME = "bench_model"
+
+
+class _Response(io.BytesIO):
+    def release_conn(self) -> None:
+        pass
+
+
+class LocalObjectStore:
+    """The part of the ``minio.Minio`` client the app uses, backed by ``<root>/<bucket>/<object>``."""
+
+    def __init__(self, endpoint=None, access_key=None, secret_key=None, secure=False):
+        self.root = Path(os.environ["LOCAL_OBJECT_STORE"])
+
+    def _path(self, bucket: str, object_name: str) -> Path:
+        path = self.root / bucket / object_name
+        if not path.exists():
+            raise FileNotFoundError(f"{bucket}/{object_name}")
+        return path
+
+    def stat_object(self, bucket: str, object_name: str):
+        stat = self._path(bucket, object_name).stat()
+        etag = hashlib.md5(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+        return SimpleNamespace(etag=etag, size=stat.st_size)
+
+    def get_object(self, bucket: str, object_name: str) -> _Response:
+        return _Response(self._path(bucket, object_name).read_bytes())
+
+    def fget_object(self, bucket: str, object_name: str, file_path: str) -> None:
+        shutil.copyfile(self._path(bucket, object_name), file_path)
+
+    def fput_object(self, bucket: str, object_name: str, file_path: str) -> None:
+        path = self.root / bucket / object_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(file_path, path)
+
+
+def prepare(
+    workdir: Path, model_type: str = "xgb", n_estimators: int = 200, train_rows: int = 20000, test_rows: int = 5000
+) -> Dict[str, str]:
+    """Build the artifacts under ``workdir`` (once) and return the app's environment."""
+    import mlflow
+
+    # Newer MLflow releases refuse the file store unless asked to
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    workdir = Path(workdir).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    transformer_path = workdir / "transformer.joblib"
+    registry_uri = (workdir / "mlruns").as_uri()
+    test_csv = workdir / "objects" / "sample-data" / "data" / "application_test.csv"
+
+    if not transformer_path.exists():
+        train = make_applications(train_rows, seed=0)
+        transformer = fit_transformer(train)
+        binning, selector = transformer["binning_process"], transformer["selector"]
+        features = [c for c in train.columns if c in binning.variable_names]
+        X = selector.transform(binning.transform(train[features]))
+        model = fit_model(X, train["TARGET"], model_type, n_estimators)
+
+        mlflow.set_tracking_uri(registry_uri)
+        mlflow.set_experiment("benchmark")
+        with mlflow.start_run(run_name=f"bench_{model_type.upper()}"):
+            flavor = mlflow.xgboost if model_type == "xgb" else mlflow.lightgbm
+            info = flavor.log_model(model, "model")
+        mlflow.register_model(info.model_uri, MODEL_NAME)
+
+        test_csv.parent.mkdir(parents=True, exist_ok=True)
+        make_applications(test_rows, seed=1, target=False).to_csv(test_csv, index=False)
+        joblib.dump(transformer, transformer_path)
+
+    return {
+        "MODEL_NAME": MODEL_NAME,
+        "MODEL_TYPE": model_type,
+        "MLFLOW_ENDPOINT": registry_uri,
+        "MLFLOW_ALLOW_FILE_STORE": "true",
+        "TRANSFORMER_PATH": str(transformer_path),
+        "MODEL_CACHE_DIR": str(workdir / "model_cache"),
+        "LOCAL_OBJECT_STORE": str(workdir / "objects"),
+        "MINIO_ENDPOINT": "local",
+        "MINIO_ACCESS_KEY": "local",
+        "MINIO_SECRET_KEY": "local",
+    }
+
+
+def serve(port: int, prefork: int = 0) -> None:
+    import minio
+    import uvicorn
+
+    minio.Minio = LocalObjectStore
+    if prefork:
+        from src.client.app.prefork import serve as serve_prefork
+
+        serve_prefork("127.0.0.1", port, prefork)
+    else:
+        uvicorn.run("src.client.app.app:app", host="127.0.0.1", port=port, log_level="warning")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workdir", required=True)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-type", choices=["xgb", "lgbm"], default="xgb")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--prefork", type=int, default=0, help="Pre-forked workers sharing one loaded model")
+    args = parser.parse_args()
+
+    # Other settings (batching, executor, caches) come from the caller's environment
+    os.environ.update(prepare(Path(args.workdir), args.model_type, args.n_estimators))
+    serve(args.port, args.prefork)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,8 +25,8 @@ def test_full_pipeline(sample_data, mlflow_client):
         bucket_name=bucket,
         raw_train_object=tr_key,
         raw_test_object=te_key,
-        dest_train_object="processed/train.csv",
-        dest_test_object="processed/test.csv",
+        dest_train_object="processed/train.parquet",
+        dest_test_object="processed/test.parquet",
         model_name="xgb",
         version="ci",
         n_features_to_select="auto",
@@ -0,0 +1,97 @@
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from testing.synthetic import CATEGORICAL, make_applications
+
+pytest.importorskip("kfp")
+
+
+class FakeMinio:
+    uploaded = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def fput_object(self, bucket, key, path):
+        self.uploaded[key] = pd.read_parquet(path)
+
+    def fget_object(self, bucket, key, path):
+        shutil.copy(key, path)
+
+
+def _load(object_name, tmp):
+    from src.kfp_outside.script.dataloader import dataloader
+
+    class Output:
+        path = str(tmp / "dataset")
+        metadata = {}
+
+    dataloader.python_func("minio:9000", "a", "s", "bucket", object_name, Output)
+    return Output
+
+
+@pytest.fixture(scope="module")
+def transformer(tmp_path_factory):
+    import minio
+    from src.kfp_outside.script.preprocess import preprocess
+
+    tmp = tmp_path_factory.mktemp("preprocess")
+    make_applications(4000, seed=1).to_parquet(tmp / "train.parquet", index=False)
+    make_applications(500, seed=2, target=False).to_parquet(tmp / "test.parquet", index=False)
+
+    class Output:
+        path = str(tmp / "transformer.joblib")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(minio, "Minio", FakeMinio)
+        # check_binning fails the step if the assembled process differs from a fresh fit
+        keys = preprocess.python_func(
+            str(tmp / "train.parquet"), str(tmp / "test.parquet"), Output, "minio:9000", "a", "s", "bucket",
+            "processed/train.csv", "processed/test.csv", n_jobs=2, check_binning=True, chunk_rows=128,
+        )
+    assert keys == ("processed/train_v1.parquet", "processed/test_v1.parquet")
+    return joblib.load(Output.path)
+
+
+def test_survivors_keep_their_screening_binning(transformer):
+    bp = transformer["binning_process"]
+    assert bp.variable_names
+    for name in bp.variable_names:
+        expected = "categorical" if name in CATEGORICAL else "numerical"
+        assert bp.get_binned_variable(name).dtype == expected
+
+
+def test_test_set_is_transformed_in_chunks(transformer):
+    # 500 rows in chunks of 128 match transforming the whole frame at once
+    bp, selector = transformer["binning_process"], transformer["selector"]
+    df = make_applications(500, seed=2, target=False)
+    binned = pd.DataFrame(bp.transform(df[bp.variable_names]), columns=bp.variable_names)
+    expected = selector.transform(binned)
+    out = FakeMinio.uploaded["processed/test_v1.parquet"]
+    assert list(out.columns) == list(binned.columns[selector.get_support()])
+    np.testing.assert_array_equal(out.to_numpy(), expected)
+
+
+def test_transformer_serves_raw_frames(transformer):
+    df = make_applications(50, seed=3, target=False)
+    bp, selector = transformer["binning_process"], transformer["selector"]
+    X = selector.transform(bp.transform(df[bp.variable_names]))
+    assert X.shape == (50, selector.get_support().sum()) and np.isfinite(X).all()
+
+
+def test_dataloader_converts_raw_csv_to_parquet(tmp_path, monkeypatch):
+    import minio
+
+    monkeypatch.setattr(minio, "Minio", FakeMinio)
+    raw = make_applications(200, seed=4)
+    raw.to_csv(tmp_path / "application_train.csv", index=False)
+
+    out = _load(str(tmp_path / "application_train.csv"), tmp_path)
+    df = pd.read_parquet(out.path)
+    assert out.metadata == {"format": "parquet", "rows": 200}
+    pd.testing.assert_frame_equal(df, pd.read_csv(tmp_path / "application_train.csv"), check_dtype=False)
+    assert df["TARGET"].dtype.kind == "i"
@@ -0,0 +1,71 @@
+import ast
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kfp_outside.script.woe import information_value, information_values, woe_table
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+COMPONENTS = [
+    SRC / "kfp_outside" / "script" / "preprocess.py",
+    SRC / "pipeline_deprecated" / "script" / "preprocess_and_push.py",
+]
+
+
+def groupby_iv(bins, y):
+    """The loop the components used before."""
+    tmp = pd.DataFrame({"b": bins, "t": y})
+    tot_g, tot_b = (tmp.t == 0).sum(), (tmp.t == 1).sum()
+    s = 0
+    for _, g in tmp.groupby("b"):
+        good = (g.t == 0).sum() or 0.5
+        bad = (g.t == 1).sum() or 0.5
+        s += (good / tot_g - bad / tot_b) * np.log((good / tot_g) / (bad / tot_b))
+    return s
+
+
+@pytest.fixture(scope="module")
+def binned():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 5000)
+    X = np.round(rng.normal(size=(5000, 5)), 1)
+    X[:, 1] = rng.integers(0, 4, 5000) * 0.3
+    X[:200, 2] = np.nan  # missing labels are not a bin
+    X[:, 3] = np.where(y == 1, 1.0, rng.integers(0, 3, 5000))  # bins without bads
+    X[:, 4] = -0.0
+    return X, y
+
+
+def test_matches_the_groupby_loop_exactly(binned):
+    X, y = binned
+    expected = np.array([groupby_iv(X[:, j], y) for j in range(X.shape[1])])
+
+    assert [information_value(X[:, j], y) for j in range(X.shape[1])] == expected.tolist()
+    np.testing.assert_array_equal(information_values(X, y), expected)
+    labels = np.array(list("abcab" * 1000))
+    assert information_value(labels, y) == groupby_iv(labels, y)
+
+
+def test_woe_per_bin(binned):
+    X, y = binned
+    labels, woe, iv = woe_table(X[:, 1], y)
+    np.testing.assert_array_equal(labels, np.unique(X[:, 1]))
+    good = np.array([((X[:, 1] == b) & (y == 0)).sum() for b in labels]) / (y == 0).sum()
+    bad = np.array([((X[:, 1] == b) & (y == 1)).sum() for b in labels]) / (y == 1).sum()
+    np.testing.assert_allclose(woe, np.log(good / bad))
+    assert iv == pytest.approx(np.sum((good - bad) * woe))
+
+
+@pytest.mark.parametrize("path", COMPONENTS, ids=lambda p: p.name)
+def test_component_copies_match(path, binned):
+    # Components are self-contained, so they carry their own copy
+    tree = ast.parse(path.read_text())
+    node = next(n for n in ast.walk(tree) if isinstance(n, ast.FunctionDef) and n.name == "information_value")
+    namespace = {"np": np, "pd": pd}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), str(path), "exec"), namespace)
+
+    X, y = binned
+    for j in range(X.shape[1]):
+        assert namespace["information_value"](X[:, j], pd.Series(y)) == information_value(X[:, j], y)
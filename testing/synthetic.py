@@ -0,0 +1,82 @@
+"""
+Synthetic Home-Credit-shaped data and a transformer/model fitted on it,
+so serving code can be exercised without MinIO or MLflow.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORICAL = {
+    "NAME_CONTRACT_TYPE": ["Cash loans", "Revolving loans"],
+    "CODE_GENDER": ["F", "M", "XNA"],
+    "NAME_EDUCATION_TYPE": [
+        "Secondary / secondary special", "Higher education",
+        "Incomplete higher", "Lower secondary",
+    ],
+    "NAME_FAMILY_STATUS": ["Married", "Single / not married", "Civil marriage", "Separated", "Widow"],
+    "OCCUPATION_TYPE": ["Laborers", "Core staff", "Sales staff", "Managers", "Drivers", "Accountants"],
+}
+
+
+def make_applications(n: int = 5000, seed: int = 0, target: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def with_missing(values, rate):
+        values = values.astype(float)
+        values[rng.uniform(size=n) < rate] = np.nan
+        return values
+
+    df = pd.DataFrame({
+        "SK_ID_CURR": np.arange(100001, 100001 + n),
+        "CNT_CHILDREN": rng.poisson(0.4, n),
+        "AMT_INCOME_TOTAL": rng.lognormal(11.9, 0.5, n).round(1),
+        "AMT_CREDIT": rng.lognormal(13.0, 0.6, n).round(1),
+        "AMT_ANNUITY": with_missing(rng.lognormal(10.1, 0.5, n).round(1), 0.01),
+        "REGION_POPULATION_RELATIVE": rng.uniform(0.001, 0.07, n),
+        "DAYS_BIRTH": -rng.integers(7500, 25000, n),
+        "DAYS_EMPLOYED": -rng.integers(0, 15000, n).astype(float),
+        "EXT_SOURCE_2": with_missing(rng.uniform(0, 0.85, n), 0.02),
+        "EXT_SOURCE_3": with_missing(rng.uniform(0, 0.9, n), 0.08),
+        "HOUR_APPR_PROCESS_START": rng.integers(0, 24, n),
+    })
+    for name, levels in CATEGORICAL.items():
+        col = pd.Series(rng.choice(levels, n), dtype=object)
+        col[rng.uniform(size=n) < 0.03] = np.nan
+        df[name] = col
+
+    if target:
+        logit = (
+            -2.3
+            - 2.5 * (df["EXT_SOURCE_2"].fillna(0.5) - 0.5)
+            - 2.0 * (df["EXT_SOURCE_3"].fillna(0.5) - 0.5)
+            + 0.3 * (df["CODE_GENDER"] == "M")
+            + 0.4 * (df["NAME_EDUCATION_TYPE"] == "Lower secondary")
+            + df["DAYS_BIRTH"] / 25000
+        )
+        df["TARGET"] = (rng.uniform(size=n) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df
+
+
+def fit_transformer(df: pd.DataFrame, k: int = 8) -> dict:
+    """Fit the same BinningProcess + SelectKBest pair the preprocess step dumps."""
+    from optbinning import BinningProcess
+    from sklearn.feature_selection import SelectKBest, f_classif
+
+    features = [c for c in df.columns if c not in ("SK_ID_CURR", "TARGET")]
+    categorical = [c for c in features if c in CATEGORICAL]
+    y = df["TARGET"]
+
+    bp = BinningProcess(variable_names=features, categorical_variables=categorical)
+    bp.fit(df[features], y)
+
+    df_b = pd.DataFrame(bp.transform(df[features]), columns=features)
+    sel = SelectKBest(f_classif, k=min(k, len(features)))
+    sel.fit(df_b.fillna(0), y)
+    return {"binning_process": bp, "selector": sel}
+
+
+def fit_model(X: np.ndarray, y, model_type: str = "xgb", n_estimators: int = 60):
+    if model_type == "xgb":
+        import xgboost as xgb
+        return xgb.XGBClassifier(n_estimators=n_estimators, max_depth=4, eval_metric="auc").fit(X, y)
+    from lightgbm import LGBMClassifier
+    return LGBMClassifier(n_estimators=n_estimators, num_leaves=15, verbose=-1).fit(X, y)
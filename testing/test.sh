@@ -6,6 +6,24 @@ echo "🐞 Running unit tests and integration tests in DEBUG mode..."
 
 pytest \
   api/test_prediction_api.py \
+  api/test_applicant_store.py \
+  api/test_score_table.py \
+  api/test_batching.py \
+  api/test_formats.py \
+  api/test_fused_kernel.py \
+  api/test_packed_forest.py \
+  api/test_model_watcher.py \
+  api/test_model_cache.py \
+  api/test_result_cache.py \
+  api/test_routing.py \
+  api/test_telemetry.py \
+  api/test_drift.py \
+  api/test_jobs.py \
+  api/test_batch_score.py \
+  api/test_explain.py \
+  api/test_admission.py \
+  pipeline/test_woe.py \
+  pipeline/test_preprocess.py \
   integration/test_pipeline_run.py \
   --log-cli-level=DEBUG \
   --capture=no \